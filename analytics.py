@@ -0,0 +1,245 @@
+"""
+Hourly analytics rollups over conversation logs.
+
+Every logged turn adds to an in-memory (hour, intent) aggregate; a background
+thread folds the pending deltas into the analytics_hourly table with additive
+upserts, so several workers can share it. Reads cover at most `hours` buckets
+times the number of intents and never touch conversation_logs.
+
+Existing logs are rolled up with the backfill command:
+
+    python analytics.py backfill             # hours up to and including the first live bucket
+    python analytics.py backfill --rebuild   # recompute everything (stop the app first)
+"""
+import json, argparse, datetime, threading, logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from db import AnalyticsRollup, ConversationLog
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ('turns', 'confidence_sum', 'faq_answers', 'llm_replies', 'escalations', 'tickets')
+MAX_HOURS = 24 * 90
+# How long after an hour ends its live deltas and write-behind logs are assumed to be flushed
+BACKFILL_SETTLE = datetime.timedelta(minutes=5)
+
+def bucket_start(ts: datetime.datetime) -> datetime.datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+def turn_outcome(reply: str, faq_answer: Optional[str], escalated: bool) -> str:
+    if escalated:
+        return 'escalated'
+    if faq_answer and reply == faq_answer:
+        return 'faq'
+    return 'policy'
+
+def _deltas(confidence: Optional[float], outcome: Optional[str], ticket_id) -> Tuple[float, ...]:
+    return (1, float(confidence or 0.0), int(outcome == 'faq'), int(outcome == 'llm'),
+            int(outcome == 'escalated'), int(ticket_id is not None))
+
+def _add(acc: Dict[Tuple, List[float]], key: Tuple, deltas) -> None:
+    row = acc.get(key)
+    if row is None:
+        acc[key] = list(deltas)
+    else:
+        for i, d in enumerate(deltas):
+            row[i] += d
+
+def upsert_deltas(db, acc: Dict[Tuple[datetime.datetime, str], List[float]]):
+    """Add the aggregated deltas to analytics_hourly (insert, or increment the existing row)."""
+    if not acc:
+        return
+    rows = [dict(bucket=bucket, intent=intent, **dict(zip(COUNTERS, values))) for (bucket, intent), values in acc.items()]
+    dialect = db.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(AnalyticsRollup)
+        table = AnalyticsRollup.__table__
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['bucket', 'intent'],
+            set_={c: table.c[c] + stmt.excluded[c] for c in COUNTERS},
+        )
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        existing = db.get(AnalyticsRollup, (row['bucket'], row['intent']))
+        if existing is None:
+            db.add(AnalyticsRollup(**row))
+        else:
+            for c in COUNTERS:
+                setattr(existing, c, getattr(existing, c) + row[c])
+
+class RollupAggregator:
+    """
+    Accumulates per-turn deltas in memory and flushes them every flush_interval
+    seconds (and on close). record() is a dict update under a lock, so it adds
+    no database work to the request path.
+    """
+    def __init__(self, session_factory: Callable, flush_interval: float = 5.0):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self._pending: Dict[Tuple[datetime.datetime, str], List[float]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flushes = 0
+        self._failed = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='analytics-rollup', daemon=True)
+            self._thread.start()
+        return self
+
+    def record(self, intent: Optional[str], confidence: Optional[float], outcome: Optional[str] = None,
+               ticket_id: Optional[int] = None, timestamp: Optional[datetime.datetime] = None):
+        key = (bucket_start(timestamp or datetime.datetime.utcnow()), intent or 'unknown')
+        deltas = _deltas(confidence, outcome, ticket_id)
+        with self._lock:
+            _add(self._pending, key, deltas)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                with self.session_factory() as db:
+                    upsert_deltas(db, pending)
+                    db.commit()
+                self._flushes += 1
+            except Exception:
+                logger.exception('Failed to flush analytics rollups; keeping them for the next flush')
+                self._failed += 1
+                with self._lock:
+                    for key, values in pending.items():
+                        _add(self._pending, key, values)
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.flush_interval + 5.0)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def buckets(self, hours: int) -> Dict[Tuple[datetime.datetime, str], List[float]]:
+        """Stored rollups for the last `hours` hours (current hour included) plus unflushed deltas."""
+        hours = max(1, min(int(hours), MAX_HOURS))
+        since = bucket_start(datetime.datetime.utcnow()) - datetime.timedelta(hours=hours - 1)
+        acc: Dict[Tuple[datetime.datetime, str], List[float]] = {}
+        with self.session_factory() as db:
+            for r in db.query(AnalyticsRollup).filter(AnalyticsRollup.bucket >= since):
+                _add(acc, (r.bucket, r.intent), [getattr(r, c) for c in COUNTERS])
+        with self._lock:
+            for key, values in self._pending.items():
+                if key[0] >= since:
+                    _add(acc, key, values)
+        return acc
+
+    def summary(self, hours: int = 24) -> Dict[str, Any]:
+        totals = [0.0] * len(COUNTERS)
+        intents: Dict[str, int] = {}
+        for (_, intent), values in self.buckets(hours).items():
+            for i, v in enumerate(values):
+                totals[i] += v
+            intents[intent] = intents.get(intent, 0) + int(values[0])
+        return dict(hours=max(1, min(int(hours), MAX_HOURS)), **_metrics(totals), intents=intents)
+
+    def hourly(self, hours: int = 24) -> List[Dict[str, Any]]:
+        per_bucket: Dict[datetime.datetime, List[float]] = {}
+        intents: Dict[datetime.datetime, Dict[str, int]] = {}
+        for (bucket, intent), values in self.buckets(hours).items():
+            _add(per_bucket, bucket, values)
+            intents.setdefault(bucket, {})[intent] = int(values[0])
+        return [dict(bucket=bucket.isoformat(), **_metrics(per_bucket[bucket]), intents=intents[bucket])
+                for bucket in sorted(per_bucket)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {'pending_buckets': pending, 'flushes': self._flushes, 'failed_flushes': self._failed}
+
+def _metrics(values: List[float]) -> Dict[str, Any]:
+    turns, conf_sum, faq, llm, escalations, tickets = values
+    rate = lambda n: n / turns if turns else 0.0
+    return {
+        'turns': int(turns),
+        'avg_confidence': rate(conf_sum),
+        'faq_deflection_rate': rate(faq),
+        'llm_rate': rate(llm),
+        'escalation_rate': rate(escalations),
+        'ticket_rate': rate(tickets),
+        'tickets': int(tickets),
+    }
+
+def backfill(session_factory, rebuild: bool = False, chunk_size: int = 50000) -> Dict[str, Any]:
+    """
+    Roll up existing conversation logs. By default every hour up to and
+    including the first bucket already in analytics_hourly is recomputed from
+    the logs and replaced: that first live hour may also hold turns logged
+    before live recording started. Later hours are left to the live rollups,
+    and re-running gives the same result. If the first live hour has not
+    settled yet, nothing is written and the result carries deferred_until.
+    rebuild=True recomputes every bucket in one transaction. Rows logged before
+    outcome and ticket_id were recorded count as turns with intent and
+    confidence only.
+    """
+    from sqlalchemy import func
+    with session_factory() as db:
+        until = None
+        if not rebuild:
+            first = db.query(func.min(AnalyticsRollup.bucket)).scalar()
+            if first is not None:
+                until = first + datetime.timedelta(hours=1)
+                if until + BACKFILL_SETTLE > datetime.datetime.utcnow():
+                    # Turns of a still-open hour may have pending live deltas; replacing it now would count them twice
+                    return {'rows': 0, 'buckets': 0, 'until': until.isoformat(),
+                            'deferred_until': (until + BACKFILL_SETTLE).isoformat()}
+        acc: Dict[Tuple[datetime.datetime, str], List[float]] = {}
+        last_id, scanned = 0, 0
+        cols = (ConversationLog.id, ConversationLog.timestamp, ConversationLog.intent, ConversationLog.confidence,
+                ConversationLog.outcome, ConversationLog.ticket_id)
+        while True:
+            q = db.query(*cols).filter(ConversationLog.id > last_id)
+            if until is not None:
+                q = q.filter(ConversationLog.timestamp < until)
+            rows = q.order_by(ConversationLog.id).limit(chunk_size).all()
+            if not rows:
+                break
+            for r in rows:
+                if r.timestamp is None:
+                    continue
+                _add(acc, (bucket_start(r.timestamp), r.intent or 'unknown'),
+                     _deltas(r.confidence, r.outcome, r.ticket_id))
+            scanned += len(rows)
+            last_id = rows[-1].id
+        stale = db.query(AnalyticsRollup)
+        if until is not None:
+            stale = stale.filter(AnalyticsRollup.bucket < until)
+        stale.delete(synchronize_session=False)
+        upsert_deltas(db, acc)
+        db.commit()
+    return {'rows': scanned, 'buckets': len({b for b, _ in acc}), 'until': until.isoformat() if until else None}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Maintain the hourly analytics rollups.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    bf = sub.add_parser('backfill', help='roll up existing conversation logs')
+    bf.add_argument('--rebuild', action='store_true', help='recompute all buckets (run with the app stopped)')
+    bf.add_argument('--chunk-size', type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    from db import SessionLocal, init_db
+    init_db()
+    print(json.dumps(backfill(SessionLocal, rebuild=args.rebuild, chunk_size=args.chunk_size), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,58 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Dict, Any, List
-from schemas import ChatRequest, ChatResponse, TicketCreate
+from schemas import ChatRequest, ChatResponse, TicketCreate, BatchChatRequest, BatchChatResponse
 from db import SessionLocal, init_db, ConversationLog, Ticket
-from nlp.advanced_nlp import AdvancedNLP
-from nlp.ner import extract_entities
-from nlp.faq import FAQRetriever
+from nlp.ner import extract_entities, residual_text, residual_words
+from nlp.admission import AsyncAdmissionGate, request_deadline
 from nlp.policy import DialogPolicy
-import json, os
+from components import ComponentRegistry
+from model_registry import ArtifactWatcher, ModelBundle, load_bundle
+from log_writer import WriteBehindLogger
+from llm import LLMClient
+from cache import HistoryCache, NLUCache
+from batch import BatchScorer, persist_results, public_fields
+from metrics import Metrics, request_timings, server_timing_header
+from analytics import RollupAggregator, turn_outcome
+from sessions import SessionStore
+import json, os, time, threading, contextlib
 
-# Optional OpenAI support (if OPENAI_API_KEY is set in env)
-OPENAI_AVAILABLE = False
-OPENAI_KEY = os.environ.get("OPENAI_API_KEY") or os.environ.get("OPENAI_API")
-if OPENAI_KEY:
-    try:
-        import openai
-        openai.api_key = OPENAI_KEY
-        OPENAI_AVAILABLE = True
-    except Exception:
-        OPENAI_AVAILABLE = False
+# Optional OpenAI support (if OPENAI_API_KEY is set in env; OPENAI_API_BASE may point at any compatible server)
+llm = LLMClient.from_env()
+OPENAI_AVAILABLE = llm is not None
+
+# Admission control for the LLM fallback (the zero-shot tier has its own, see nlp/advanced_nlp.py):
+# concurrent calls, requests allowed to queue and how long they may wait before the reply degrades
+# to the FAQ/policy path. LLM_MAX_CONCURRENT=0 disables it. REQUEST_DEADLINE_MS (0 = none) also caps
+# queueing at both tiers by the time left in the request's budget.
+LLM_MAX_CONCURRENT = int(os.environ.get('LLM_MAX_CONCURRENT', '16'))
+llm_gate = AsyncAdmissionGate(
+    'llm', LLM_MAX_CONCURRENT,
+    max_queue=int(os.environ.get('LLM_MAX_QUEUE', '32')),
+    max_wait_ms=float(os.environ.get('LLM_MAX_QUEUE_WAIT_MS', '200')),
+) if OPENAI_AVAILABLE and LLM_MAX_CONCURRENT > 0 else None
+REQUEST_DEADLINE_MS = float(os.environ.get('REQUEST_DEADLINE_MS', '0'))
+
+# Optional write-behind persistence of conversation logs (bulk inserts off the request path)
+LOG_WRITE_BEHIND = os.environ.get('LOG_WRITE_BEHIND', '0').lower() in ('1', 'true', 'yes')
+
+# Prometheus metrics at /metrics; optional per-request Server-Timing header with stage durations
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1').lower() in ('1', 'true', 'yes')
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '0').lower() in ('1', 'true', 'yes')
+
+metrics = Metrics(enabled=METRICS_ENABLED)
+metrics.histogram('chat_request_seconds', 'End-to-end chat request latency by endpoint')
+metrics.histogram('chat_stage_seconds', 'Latency of each chat pipeline stage')
+metrics.counter('chat_requests_total', 'Chat requests by endpoint')
+metrics.counter('chat_classifier_tier_total', 'Messages by the classifier tier that answered (cache = NLU cache hit, session = slot-filling follow-up)')
+metrics.counter('chat_faq_lookups_total', 'FAQ lookups by result')
+metrics.counter('chat_llm_replies_total', 'LLM fallback calls by result')
+metrics.counter('chat_escalations_total', 'Policy decisions that escalate to a human')
+metrics.counter('chat_tickets_created_total', 'Support tickets created')
+metrics.counter('chat_degraded_total', 'Messages answered by a cheaper path because a stage shed load, by stage')
 
 app = FastAPI(title='Customer Service Chatbot API', version='2.0.0 (advanced)')
 
@@ -30,92 +64,308 @@ app.add_middleware(
     allow_headers=['*'],
 )
 
-# Initialize DB & components
-init_db()
-nlp = AdvancedNLP()
-faq = FAQRetriever()
+if SERVER_TIMING:
+    @app.middleware('http')
+    async def server_timing(request: Request, call_next):
+        timings = {}
+        token = request_timings.set(timings)
+        try:
+            response = await call_next(request)
+        finally:
+            request_timings.reset(token)
+        if timings:
+            response.headers['Server-Timing'] = server_timing_header(timings)
+        return response
+
+# Model hot reload: admin token for /admin/models/reload (the endpoint is refused until one is set),
+# optional polling of the artifact files
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', '0'))
+# Seconds an outgoing model bundle stays open for requests still using it
+MODEL_RETIRE_GRACE = float(os.environ.get('MODEL_RETIRE_GRACE', '60'))
+
+# Heavy components are built lazily (first use or the startup warm-up), never at import time
+def _init_db():
+    init_db()
+    return SessionLocal
+
+registry = ComponentRegistry()
+registry.register('db', _init_db)
+registry.register('models', load_bundle, warmup=ModelBundle.warm_up)
+
+def session():
+    return registry.get('db')()
+
 policy = DialogPolicy()
+log_writer = WriteBehindLogger(
+    session, ConversationLog,
+    max_queue=int(os.environ.get('LOG_QUEUE_SIZE', '10000')),
+    batch_size=int(os.environ.get('LOG_BATCH_SIZE', '200')),
+    flush_interval=float(os.environ.get('LOG_FLUSH_INTERVAL', '0.5')),
+).start() if LOG_WRITE_BEHIND else None
+history_cache = HistoryCache(
+    max_bytes=int(os.environ.get('HISTORY_CACHE_MAX_BYTES', str(32 * 1024 * 1024))),
+    ttl=float(os.environ.get('HISTORY_CACHE_TTL', '1800')),
+    max_turns=int(os.environ.get('HISTORY_CACHE_TURNS', '16')),
+)
+
+def model_version():
+    # Changes whenever a new model bundle is swapped in.
+    bundle = registry.peek('models')
+    return bundle.version if bundle is not None else None
+
+nlu_cache = NLUCache(
+    max_entries=int(os.environ.get('NLU_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('NLU_CACHE_TTL', '600')),
+    version_fn=model_version,
+)
+
+# Outgoing bundles waiting out MODEL_RETIRE_GRACE, with the timer that will close them
+_retiring: List[Any] = []
+_retiring_lock = threading.Lock()
+
+def reload_models():
+    old, new = registry.reload('models')
+    nlu_cache.clear()
+    if old is not None and old is not new:
+        # In-flight requests hold a reference to the old bundle; close it once they are done.
+        timer = threading.Timer(MODEL_RETIRE_GRACE, old.close)
+        timer.daemon = True
+        with _retiring_lock:
+            _retiring[:] = [(t, b) for t, b in _retiring if t.is_alive()]
+            _retiring.append((timer, old))
+        timer.start()
+    return old, new
+
+def close_retiring_bundles():
+    # Shutdown: nothing is in flight any more, so close the outgoing bundles now
+    with _retiring_lock:
+        retiring, _retiring[:] = list(_retiring), []
+    for timer, bundle in retiring:
+        timer.cancel()
+        bundle.close()
+
+# /chat/batch: BATCH_WORKERS > 1 spreads chunks over a process pool, otherwise scores in-process
+batch_scorer = BatchScorer(
+    lambda: registry.get('models'),
+    workers=int(os.environ.get('BATCH_WORKERS', '0')),
+    chunk_size=int(os.environ.get('BATCH_CHUNK_SIZE', '256')),
+)
+
+# Hourly analytics rollups, updated as turns are logged and flushed in the background
+ANALYTICS_ENABLED = os.environ.get('ANALYTICS_ENABLED', '1').lower() in ('1', 'true', 'yes')
+rollups = RollupAggregator(session, flush_interval=float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', '5'))) if ANALYTICS_ENABLED else None
+
+# Dialog sessions: a reply that asks for slots remembers the intent, so a follow-up that just
+# supplies them (conversation_id required) skips intent classification and FAQ search
+DIALOG_SESSIONS = os.environ.get('DIALOG_SESSIONS', '1').lower() in ('1', 'true', 'yes')
+sessions = SessionStore(
+    max_sessions=int(os.environ.get('SESSION_MAX', '100000')),
+    ttl=float(os.environ.get('SESSION_TTL', '900')),
+    max_extra_words=int(os.environ.get('SESSION_FOLLOWUP_MAX_WORDS', '5')),
+) if DIALOG_SESSIONS else None
+# Confidence at which the cheap tiers' reading of a follow-up's other words counts as a new intent
+SESSION_SWITCH_CONF = float(os.environ.get('SESSION_SWITCH_CONF', '0.5'))
+
+artifact_watcher = ArtifactWatcher(reload_models, interval=MODEL_WATCH_INTERVAL) if MODEL_WATCH_INTERVAL > 0 else None
+
+@app.on_event('startup')
+def startup():
+    registry.warm_up_async()
+    if artifact_watcher:
+        artifact_watcher.start()
+    if rollups:
+        rollups.start()
+
+@app.on_event('shutdown')
+async def shutdown():
+    if llm:
+        await llm.aclose()
+    if artifact_watcher:
+        artifact_watcher.stop()
+    if log_writer:
+        log_writer.close()
+    if rollups:
+        rollups.close()
+    batch_scorer.close()
+    close_retiring_bundles()
+    bundle = registry.peek('models')
+    if bundle is not None:
+        bundle.close()
 
 @app.get('/health')
 def health():
+    # Liveness only: answers as soon as the process is up, models or not
     return {'status': 'ok', 'mode': 'advanced'}
 
+@app.get('/ready')
+def ready(response: Response):
+    # Readiness: every component is loaded and has served a warm-up inference
+    is_ready = registry.ready()
+    if not is_ready:
+        response.status_code = 503
+    return {'ready': is_ready, 'components': registry.status()}
+
+@app.get('/admin/models')
+def admin_models():
+    return {'version': model_version(), 'status': registry.status()['models']}
+
+@app.post('/admin/models/reload')
+async def admin_reload_models(x_admin_token: str = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail='model reload is disabled: set ADMIN_TOKEN')
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail='invalid admin token')
+    # Loads and warms the new bundle off the event loop; requests keep using the current one meanwhile
+    old, new = await run_in_threadpool(reload_models)
+    return {'previous': old.version if old is not None else None, 'version': new.version}
+
+@app.get('/metrics')
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4')
+
+@app.get('/stats')
+def stats():
+    bundle = registry.peek('models')
+    nlp = bundle.nlp if bundle else None
+    return {
+        'model_version': model_version(),
+        'zero_shot_batching': nlp.batch_stats() if nlp else {},
+        'intent_tiers': nlp.tier_stats() if nlp else {},
+        'log_writer': log_writer.stats() if log_writer else {},
+        'history_cache': history_cache.stats(),
+        'nlu_cache': nlu_cache.stats(),
+        'analytics': rollups.stats() if rollups else {},
+        'sessions': sessions.stats() if sessions else {},
+        'llm_admission': llm_gate.stats() if llm_gate else {},
+    }
+
+def _rollups() -> RollupAggregator:
+    if rollups is None:
+        raise HTTPException(status_code=404, detail='analytics disabled')
+    return rollups
+
+@app.get('/analytics/summary')
+def analytics_summary(hours: int = 24):
+    # Turns, average confidence, FAQ deflection / escalation / ticket rates and intent mix over the window
+    return _rollups().summary(hours)
+
+@app.get('/analytics/hourly')
+def analytics_hourly(hours: int = 24):
+    return {'buckets': _rollups().hourly(hours)}
+
 def get_conversation_history(conversation_id: str, limit: int = 10) -> List[Dict[str, Any]]:
     history = []
     if not conversation_id:
         return history
+    cached = history_cache.get(conversation_id, limit)
+    if cached is not None:
+        return cached
     try:
-        with SessionLocal() as db:
-            rows = db.query(ConversationLog).filter(ConversationLog.conversation_id == conversation_id).order_by(ConversationLog.id.desc()).limit(limit).all()
+        # Cold miss: load a full ring buffer's worth so later turns are served from memory
+        with metrics.stage('db_history'), session() as db:
+            rows = db.query(ConversationLog.user_message, ConversationLog.bot_reply).filter(ConversationLog.conversation_id == conversation_id).order_by(ConversationLog.id.desc()).limit(max(limit, history_cache.max_turns)).all()
             for r in reversed(rows):
                 history.append({'user': r.user_message, 'bot': r.bot_reply})
+        history_cache.fill(conversation_id, history)
     except Exception:
         pass
-    return history
+    return history[-limit:]
+
+def log_turn(**row):
+    history_cache.append(row.get('conversation_id'), row.get('user_message'), row.get('bot_reply'))
+    if rollups:
+        rollups.record(row.get('intent'), row.get('confidence'), row.get('outcome'), row.get('ticket_id'))
+    # Queued for a bulk insert when write-behind is on, otherwise committed right away.
+    if log_writer:
+        log_writer.log(**row)
+        return
+    with metrics.stage('db_log'), session() as db:
+        db.add(ConversationLog(**row))
+        db.commit()
 
-def openai_reply(message: str, history: List[Dict[str,Any]]) -> str:
+async def openai_reply(message: str, history: List[Dict[str,Any]]) -> str:
     if not OPENAI_AVAILABLE:
         return ""
-    try:
-        msgs = [{"role": "system", "content": "You are a helpful customer support assistant for an e-commerce store. Be concise and friendly."}]
-        for turn in history:
-            if 'user' in turn and turn['user']:
-                msgs.append({"role": "user", "content": turn['user']})
-            if 'bot' in turn and turn['bot']:
-                msgs.append({"role": "assistant", "content": turn['bot']})
-        msgs.append({"role": "user", "content": message})
-        resp = openai.ChatCompletion.create(model="gpt-3.5-turbo", messages=msgs, max_tokens=200, temperature=0.2)
-        return resp.choices[0].message['content'].strip()
-    except Exception:
-        return ""
-
-@app.post('/chat', response_model=ChatResponse)
-def chat(req: ChatRequest):
-    text = req.message.strip()
-    conv_id = req.conversation_id or 'default'
+    with metrics.stage('llm'):
+        reply = await llm.complete(message, history)
+    metrics.inc('chat_llm_replies_total', result='ok' if reply else 'empty')
+    return reply
 
-    # 1) classify intent with advanced NLP
-    intent, conf, meta = nlp.classify_intent(text)
+def llm_slot():
+    # async with llm_slot() as admitted: ...
+    return llm_gate.slot() if llm_gate else contextlib.nullcontext(True)
 
-    # 2) extract regex entities
-    entities = extract_entities(text)
+def start_deadline():
+    if REQUEST_DEADLINE_MS <= 0:
+        return None
+    return request_deadline.set(time.monotonic() + REQUEST_DEADLINE_MS / 1000.0)
 
-    # 3) FAQ fallback
-    faq_answer, faq_score = faq.search(text)
+def followup_intent(text: str):
+    # What the sklearn/keyword tiers make of a slot-filling reply once its entities are removed
+    cheap = registry.get('models').nlp.classify_cheap(residual_text(text))
+    return cheap[0] if cheap and cheap[1] >= SESSION_SWITCH_CONF else None
 
-    reply = ""
-    next_action = None
-    ticket_id = None
+def analyze(text: str, session_id: str = None):
+    # CPU-bound NLU stages; run in the threadpool so the event loop stays free.
+    # Entities always come from the original text; intent and FAQ results are
+    # shared by messages that normalize to the same cache key.
+    # The last two values: the message answered a pending slot request, and the
+    # intent came from a cheaper tier because zero-shot was shedding load.
+    with metrics.stage('extract_entities'):
+        entities = extract_entities(text)
+    if sessions and session_id and entities and sessions.get(session_id) is not None:
+        extra_words = residual_words(text)
+        pending = sessions.followup(session_id, entities, extra_words,
+                                    followup_intent(text) if extra_words else None)
+        if pending is not None:
+            metrics.inc('chat_classifier_tier_total', tier='session')
+            return pending.intent, pending.confidence, {**pending.slots, **entities}, None, 0.0, model_version(), True, False
+    cached = nlu_cache.get(text, version=model_version())
+    if cached is not None:
+        intent, conf, faq_answer, faq_score, version = cached
+        metrics.inc('chat_classifier_tier_total', tier='cache')
+        metrics.inc('chat_faq_lookups_total', result='hit' if faq_answer else 'miss')
+        return intent, conf, entities, faq_answer, faq_score, version, False, False
+    # One bundle for the whole request, even if a reload swaps in a new one meanwhile
+    bundle = registry.get('models')
+    # 1) classify intent with advanced NLP
+    with metrics.stage('classify_intent'):
+        intent, conf, meta = bundle.nlp.classify_intent(text)
+    metrics.inc('chat_classifier_tier_total', tier=meta.get('tier', 'unknown'))
+    degraded = bool(meta.get('degraded'))
+    if degraded:
+        metrics.inc('chat_degraded_total', stage='zero_shot')
+    # 2) FAQ fallback
+    with metrics.stage('faq_search'):
+        faq_answer, faq_score = bundle.faq.search(text)
+    metrics.inc('chat_faq_lookups_total', result='hit' if faq_answer else 'miss')
+    # A degraded answer is not cached, so the message gets the full model once load drops
+    if not degraded:
+        nlu_cache.put(text, (intent, conf, faq_answer, faq_score, bundle.version), version=bundle.version)
+    return intent, conf, entities, faq_answer, faq_score, bundle.version, False, degraded
 
-    # If confidence is low and OpenAI available, ask OpenAI to craft a better response using conversation history
-    if conf < 0.50 and OPENAI_AVAILABLE:
-        history = get_conversation_history(conv_id, limit=8)
-        ai_resp = openai_reply(text, history)
-        if ai_resp:
-            reply = ai_resp
-            # Log and return
-            with SessionLocal() as db:
-                log = ConversationLog(
-                    user_id=req.user_id or 'anonymous',
-                    conversation_id=conv_id,
-                    user_message=text,
-                    bot_reply=reply,
-                    intent=intent,
-                    confidence=conf,
-                    entities=json.dumps(entities)
-                )
-                db.add(log)
-                db.commit()
-            return ChatResponse(reply=reply, intent=intent, confidence=conf, entities=entities, faq_answer=faq_answer)
-
-    # Otherwise use existing policy logic (slot filling, FAQ, escalation)
-    decision = policy.decide(intent=intent, confidence=conf, entities=entities, faq=(faq_answer, faq_score))
+def policy_turn(req: ChatRequest, text: str, conv_id: str, intent: str, conf: float,
+                entities: Dict[str, Any], faq_answer, faq_score, version: str, degraded: bool = False) -> ChatResponse:
+    # Existing policy logic (slot filling, FAQ, escalation)
+    with metrics.stage('policy_decide'):
+        decision = policy.decide(intent=intent, confidence=conf, entities=entities, faq=(faq_answer, faq_score),
+                                 degraded=degraded)
     reply = decision.get('reply', 'Sorry, I could not handle that.')
     next_action = decision.get('next_action')
+    if sessions and req.conversation_id:
+        if next_action == 'request_slots':
+            sessions.set_pending(conv_id, intent, conf, entities, policy.missing_slots(intent, entities))
+        else:
+            sessions.clear(conv_id)
+    outcome = turn_outcome(reply, faq_answer, bool(decision.get('create_ticket')))
+    ticket_id = None
 
-    # Ticket creation for escalations
+    # Ticket creation for escalations (committed synchronously so the reply carries a real id;
+    # it never waits on queued log rows)
     if decision.get('create_ticket'):
-        with SessionLocal() as db:
+        metrics.inc('chat_escalations_total')
+        with metrics.stage('db_ticket'), session() as db:
             t = Ticket(
                 user_id=req.user_id or 'anonymous',
                 conversation_id=conv_id,
@@ -126,21 +376,22 @@ def chat(req: ChatRequest):
             db.commit()
             db.refresh(t)
             ticket_id = t.id
+            metrics.inc('chat_tickets_created_total')
             reply += f"\\nI created a support ticket for you: #{ticket_id}. Our team will reach out soon."
 
     # Log conversation
-    with SessionLocal() as db:
-        log = ConversationLog(
-            user_id=req.user_id or 'anonymous',
-            conversation_id=conv_id,
-            user_message=text,
-            bot_reply=reply,
-            intent=intent,
-            confidence=conf,
-            entities=json.dumps(entities)
-        )
-        db.add(log)
-        db.commit()
+    log_turn(
+        user_id=req.user_id or 'anonymous',
+        conversation_id=conv_id,
+        user_message=text,
+        bot_reply=reply,
+        intent=intent,
+        confidence=conf,
+        entities=json.dumps(entities),
+        model_version=version,
+        outcome=outcome,
+        ticket_id=ticket_id
+    )
 
     return ChatResponse(
         reply=reply,
@@ -149,5 +400,138 @@ def chat(req: ChatRequest):
         entities=entities,
         faq_answer=faq_answer,
         next_action=next_action,
-        ticket_id=ticket_id
+        ticket_id=ticket_id,
+        degraded=degraded
+    )
+
+async def log_llm_turn(req: ChatRequest, text: str, conv_id: str, reply: str, intent: str, conf: float,
+                       entities: Dict[str, Any], faq_answer, version: str) -> ChatResponse:
+    await run_in_threadpool(
+        log_turn,
+        user_id=req.user_id or 'anonymous',
+        conversation_id=conv_id,
+        user_message=text,
+        bot_reply=reply,
+        intent=intent,
+        confidence=conf,
+        entities=json.dumps(entities),
+        model_version=version,
+        outcome='llm'
     )
+    return ChatResponse(reply=reply, intent=intent, confidence=conf, entities=entities, faq_answer=faq_answer)
+
+@app.post('/chat', response_model=ChatResponse)
+async def chat(req: ChatRequest):
+    started = time.perf_counter()
+    deadline = start_deadline()
+    try:
+        return await _chat(req)
+    finally:
+        if deadline is not None:
+            request_deadline.reset(deadline)
+        metrics.inc('chat_requests_total', endpoint='/chat')
+        metrics.observe('chat_request_seconds', time.perf_counter() - started, endpoint='/chat')
+
+async def _chat(req: ChatRequest) -> ChatResponse:
+    text = req.message.strip()
+    conv_id = req.conversation_id or 'default'
+    intent, conf, entities, faq_answer, faq_score, version, followup, degraded = await run_in_threadpool(analyze, text, req.conversation_id)
+
+    # If confidence is low and OpenAI available, ask OpenAI to craft a better response using conversation history
+    if conf < 0.50 and OPENAI_AVAILABLE and not followup:
+        ai_resp = ''
+        async with llm_slot() as admitted:
+            if admitted:
+                history = await run_in_threadpool(get_conversation_history, conv_id, 8)
+                ai_resp = await openai_reply(text, history)
+        if ai_resp:
+            return await log_llm_turn(req, text, conv_id, ai_resp, intent, conf, entities, faq_answer, version)
+        if not admitted:
+            degraded = True
+            metrics.inc('chat_degraded_total', stage='llm')
+
+    return await run_in_threadpool(policy_turn, req, text, conv_id, intent, conf, entities, faq_answer, faq_score, version, degraded)
+
+def sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+@app.post('/chat/stream')
+async def chat_stream(req: ChatRequest):
+    """
+    Server-sent events version of /chat:
+    `meta` (intent, confidence, entities), then one or more `token` events with
+    reply text as it is produced, then `done` with the full ChatResponse.
+    """
+    started = time.perf_counter()
+    metrics.inc('chat_requests_total', endpoint='/chat/stream')
+    text = req.message.strip()
+    conv_id = req.conversation_id or 'default'
+    token = start_deadline()
+    deadline = request_deadline.get()
+    try:
+        intent, conf, entities, faq_answer, faq_score, version, followup, degraded = await run_in_threadpool(analyze, text, req.conversation_id)
+    finally:
+        if token is not None:
+            request_deadline.reset(token)
+
+    async def events():
+        # The body is sent from another task; carry the request deadline over to it
+        token = request_deadline.set(deadline)
+        try:
+            async for event in _events(degraded):
+                yield event
+        finally:
+            request_deadline.reset(token)
+            metrics.observe('chat_request_seconds', time.perf_counter() - started, endpoint='/chat/stream')
+
+    async def _events(degraded):
+        yield sse('meta', {'intent': intent, 'confidence': conf, 'entities': entities})
+        if conf < 0.50 and OPENAI_AVAILABLE and not followup:
+            parts = []
+            async with llm_slot() as admitted:
+                if admitted:
+                    history = await run_in_threadpool(get_conversation_history, conv_id, 8)
+                    with metrics.stage('llm'):
+                        async for delta in llm.stream(text, history):
+                            parts.append(delta)
+                            yield sse('token', {'text': delta})
+            if admitted:
+                reply = ''.join(parts).strip()
+                metrics.inc('chat_llm_replies_total', result='ok' if reply else 'empty')
+                if reply:
+                    resp = await log_llm_turn(req, text, conv_id, reply, intent, conf, entities, faq_answer, version)
+                    yield sse('done', resp)
+                    return
+            else:
+                degraded = True
+                metrics.inc('chat_degraded_total', stage='llm')
+        resp = await run_in_threadpool(policy_turn, req, text, conv_id, intent, conf, entities, faq_answer, faq_score, version, degraded)
+        yield sse('token', {'text': resp.reply})
+        yield sse('done', resp)
+
+    return StreamingResponse(events(), media_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.post('/chat/batch', response_model=BatchChatResponse)
+async def chat_batch(req: BatchChatRequest):
+    """
+    Score many requests at once (transcript replay, QA datasets) without the LLM fallback.
+    dry_run skips DB writes; stream returns results as JSON lines while later chunks are still running.
+    """
+    items = [jsonable_encoder(r) for r in req.requests]
+
+    def chunks():
+        for chunk, results in batch_scorer.score_chunks(items):
+            if not req.dry_run:
+                persist_results(chunk, results, session, rollups)
+            yield results
+
+    if req.stream:
+        def lines():
+            for results in chunks():
+                for res in results:
+                    yield json.dumps(public_fields(res)) + '\n'
+        return StreamingResponse(lines(), media_type='application/x-ndjson')
+
+    def run():
+        return [ChatResponse(**public_fields(res)) for results in chunks() for res in results]
+    return BatchChatResponse(results=await run_in_threadpool(run))
@@ -0,0 +1,174 @@
+"""
+Bulk scoring of chat requests, for transcript replay and QA datasets.
+
+Classification, entity extraction, FAQ search and DialogPolicy.decide run over
+chunks of requests at once, optionally spread across a process pool. The LLM
+fallback is not used here. Results keep the input order.
+
+    python batch.py transcripts.jsonl -o scored.jsonl --workers 4 --dry-run
+
+Each input line is a ChatRequest object ({"message": ..., "user_id": ..., "conversation_id": ...}).
+"""
+import os, sys, json, argparse, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from nlp.ner import extract_entities
+from nlp.policy import DialogPolicy
+from analytics import turn_outcome
+
+RESPONSE_FIELDS = ('reply', 'intent', 'confidence', 'entities', 'faq_answer', 'next_action', 'ticket_id')
+
+_policy = DialogPolicy()
+_worker_bundle = None
+
+def score_requests(items: List[Dict[str, Any]], bundle, policy: DialogPolicy = _policy) -> List[Dict[str, Any]]:
+    texts = [str(item.get('message') or '').strip() for item in items]
+    intents = bundle.nlp.classify_many(texts)
+    ranked = bundle.faq.search_many(texts, k=1)
+    results = []
+    for text, (intent, conf, meta), candidates in zip(texts, intents, ranked):
+        entities = extract_entities(text)
+        faq_answer, faq_score = None, 0.0
+        if candidates:
+            answer, faq_score = candidates[0]
+            if faq_score >= bundle.faq.threshold:
+                faq_answer = answer
+        decision = policy.decide(intent=intent, confidence=conf, entities=entities, faq=(faq_answer, faq_score))
+        reply = decision.get('reply', 'Sorry, I could not handle that.')
+        results.append({
+            'reply': reply,
+            'intent': intent,
+            'confidence': conf,
+            'entities': entities,
+            'faq_answer': faq_answer,
+            'next_action': decision.get('next_action'),
+            'ticket_id': None,
+            'create_ticket': bool(decision.get('create_ticket')),
+            'ticket_subject': decision.get('ticket_subject', 'Support Request'),
+            'model_version': bundle.version,
+            'outcome': turn_outcome(reply, faq_answer, bool(decision.get('create_ticket'))),
+        })
+    return results
+
+def _init_worker():
+    global _worker_bundle
+    from model_registry import load_bundle
+    _worker_bundle = load_bundle()
+
+def _score_chunk(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return score_requests(items, _worker_bundle)
+
+class BatchScorer:
+    """
+    Scores requests chunk by chunk. With workers > 1 the chunks are spread over
+    a process pool whose workers each load their own model bundle (the FAQ
+    index pages are shared through the page cache); otherwise bundle_fn()
+    supplies the bundle in-process.
+    """
+    def __init__(self, bundle_fn: Callable[[], Any], workers: int = 0, chunk_size: int = 256):
+        self.bundle_fn = bundle_fn
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: workers must not inherit the parent's threads and locks
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_init_worker)
+        return self._pool
+
+    def score_chunks(self, items: List[Dict[str, Any]]) -> Iterator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Yield (chunk_items, chunk_results) pairs in input order."""
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        if self.workers > 1 and len(chunks) > 1:
+            yield from zip(chunks, self._get_pool().map(_score_chunk, chunks))
+            return
+        bundle = self.bundle_fn()
+        for chunk in chunks:
+            yield chunk, score_requests(chunk, bundle)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+def persist_results(items: List[Dict[str, Any]], results: List[Dict[str, Any]], session_factory, rollups=None):
+    """Create tickets and insert log rows for one chunk in a single transaction, then feed the rollups."""
+    from db import ConversationLog, Ticket
+    with session_factory() as db:
+        tickets = []
+        for item, res in zip(items, results):
+            if res['create_ticket']:
+                t = Ticket(
+                    user_id=item.get('user_id') or 'anonymous',
+                    conversation_id=item.get('conversation_id') or 'default',
+                    subject=res['ticket_subject'],
+                    details=f"User said: {str(item.get('message') or '').strip()}\\nEntities: {json.dumps(res['entities'])}"
+                )
+                db.add(t)
+                tickets.append((res, t))
+        if tickets:
+            db.flush()
+        for res, t in tickets:
+            res['ticket_id'] = t.id
+            res['reply'] += f"\\nI created a support ticket for you: #{t.id}. Our team will reach out soon."
+        db.bulk_insert_mappings(ConversationLog, [{
+            'user_id': item.get('user_id') or 'anonymous',
+            'conversation_id': item.get('conversation_id') or 'default',
+            'user_message': str(item.get('message') or '').strip(),
+            'bot_reply': res['reply'],
+            'intent': res['intent'],
+            'confidence': res['confidence'],
+            'entities': json.dumps(res['entities']),
+            'model_version': res['model_version'],
+            'outcome': res['outcome'],
+            'ticket_id': res['ticket_id'],
+        } for item, res in zip(items, results)])
+        db.commit()
+    if rollups is not None:
+        for res in results:
+            rollups.record(res['intent'], res['confidence'], res['outcome'], res['ticket_id'])
+
+def public_fields(res: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: res[k] for k in RESPONSE_FIELDS}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score a JSONL file of chat requests in bulk.')
+    parser.add_argument('input', help="JSONL file of ChatRequest objects ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file ('-' for stdout)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=256)
+    parser.add_argument('--dry-run', action='store_true', help='do not write logs or tickets to the database')
+    args = parser.parse_args(argv)
+
+    with (sys.stdin if args.input == '-' else open(args.input)) as f:
+        items = [json.loads(line) for line in f if line.strip()]
+
+    session_factory, rollups = None, None
+    if not args.dry_run:
+        from db import SessionLocal, init_db
+        init_db()
+        session_factory = SessionLocal
+        if os.environ.get('ANALYTICS_ENABLED', '1').lower() in ('1', 'true', 'yes'):
+            from analytics import RollupAggregator
+            rollups = RollupAggregator(SessionLocal)
+
+    from model_registry import load_bundle
+    scorer = BatchScorer(load_bundle, workers=args.workers, chunk_size=args.chunk_size)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        for chunk, results in scorer.score_chunks(items):
+            if session_factory:
+                persist_results(chunk, results, session_factory, rollups)
+            for res in results:
+                out.write(json.dumps(public_fields(res)) + '\n')
+    finally:
+        scorer.close()
+        if rollups is not None:
+            rollups.close()
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == '__main__':
+    main()
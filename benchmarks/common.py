@@ -0,0 +1,82 @@
+import os, sys, json, time, random, platform, subprocess
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    if not latencies:
+        return {'count': 0}
+    xs = sorted(latencies)
+    pick = lambda q: xs[min(len(xs) - 1, int(round(q * (len(xs) - 1))))] * 1000.0
+    return {
+        'count': len(xs),
+        'mean': 1000.0 * sum(xs) / len(xs),
+        'p50': pick(0.50),
+        'p95': pick(0.95),
+        'p99': pick(0.99),
+        'max': xs[-1] * 1000.0,
+    }
+
+def load_intent_examples() -> List[Dict[str, str]]:
+    with open(os.path.join(DATA_DIR, 'intents.json')) as f:
+        data = json.load(f)
+    return [{'intent': i.get('name'), 'message': ex} for i in data.get('intents', []) for ex in i.get('examples', [])]
+
+def load_faq_pairs(path: Optional[str] = None) -> List[Dict[str, str]]:
+    import csv
+    with open(path or os.path.join(DATA_DIR, 'faq_large.csv'), newline='', encoding='utf-8') as f:
+        return [{'question': r['question'], 'answer': r['answer']} for r in csv.DictReader(f)]
+
+def random_order_id(rng: random.Random) -> str:
+    return f'{rng.randint(100, 999)}-{rng.randint(1000000, 9999999)}-{rng.randint(1000000, 9999999)}'
+
+def generate_traffic(n: int, seed: int = 0, faq_share: float = 0.3, conversations: int = 0) -> List[Dict[str, str]]:
+    """
+    Realistic-ish /chat traffic: intent examples (some with order IDs attached)
+    mixed with FAQ questions, spread over a pool of conversations.
+    """
+    rng = random.Random(seed)
+    examples = load_intent_examples()
+    questions = [p['question'] for p in load_faq_pairs()]
+    conversations = conversations or max(1, n // 5)
+    traffic = []
+    for i in range(n):
+        if rng.random() < faq_share:
+            message = rng.choice(questions)
+        else:
+            ex = rng.choice(examples)
+            message = ex['message']
+            if ex['intent'] in ('track_order', 'refund_status', 'cancel_order') and rng.random() < 0.5:
+                message = f'{message} {random_order_id(rng)}'
+        traffic.append({
+            'message': message,
+            'user_id': f'bench-user-{i % 97}',
+            'conversation_id': f'bench-conv-{rng.randrange(conversations)}',
+        })
+    return traffic
+
+def run_metadata(**config) -> Dict[str, Any]:
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                             text=True).stdout.strip() or None
+    except OSError:
+        rev = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'git_rev': rev,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'config': config,
+    }
+
+def write_results(results: Dict[str, Any], path: Optional[str]):
+    text = json.dumps(results, indent=2)
+    if path and path != '-':
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+        print(f'Wrote {path}', file=sys.stderr)
+    else:
+        print(text)
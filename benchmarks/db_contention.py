@@ -0,0 +1,95 @@
+"""
+SQLite contention benchmark for the conversation log.
+
+Runs concurrent writer threads (one-row commits, like log_turn) and reader
+threads (the history lookup) against a fresh database for a fixed duration,
+once with the rollback journal and once with the tuned WAL pragmas from db.py,
+and reports throughput, latency percentiles and lock errors for each.
+
+    python -m benchmarks.db_contention --writers 4 --readers 8 --seconds 10 -o db.json
+"""
+import os, time, random, argparse, tempfile, threading
+from typing import Any, Dict
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from benchmarks.common import run_metadata, summarize, write_results
+
+def bench_config(name: str, pragmas: Dict[str, Any], writers: int, readers: int, seconds: float,
+                 conversations: int, seed_rows: int) -> Dict[str, Any]:
+    from db import Base, ConversationLog, make_engine
+    path = os.path.join(tempfile.mkdtemp(prefix='db-bench-'), 'bench.db')
+    engine = make_engine(f'sqlite:///{path}', pragmas=pragmas, pool_size=writers + readers)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        db.bulk_insert_mappings(ConversationLog, [
+            {'conversation_id': f'c{i % conversations}', 'user_id': 'u', 'user_message': 'hello there', 'bot_reply': 'hi!'}
+            for i in range(seed_rows)])
+        db.commit()
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies = {'write': [], 'read': []}
+    errors = {'write': 0, 'read': 0}
+
+    def run(kind: str, seed: int):
+        rng = random.Random(seed)
+        local, failed = [], 0
+        while not stop.is_set():
+            conv = f'c{rng.randrange(conversations)}'
+            started = time.perf_counter()
+            try:
+                with Session() as db:
+                    if kind == 'write':
+                        db.add(ConversationLog(conversation_id=conv, user_id='u', user_message='where is my order',
+                                               bot_reply='Out for delivery.', intent='track_order', confidence=0.9))
+                        db.commit()
+                    else:
+                        db.query(ConversationLog.user_message, ConversationLog.bot_reply).filter(
+                            ConversationLog.conversation_id == conv).order_by(ConversationLog.id.desc()).limit(16).all()
+            except OperationalError:
+                failed += 1
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies[kind] += local
+            errors[kind] += failed
+
+    threads = [threading.Thread(target=run, args=('write', i)) for i in range(writers)]
+    threads += [threading.Thread(target=run, args=('read', 1000 + i)) for i in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    return {
+        'config': name,
+        'writes_per_s': len(latencies['write']) / seconds,
+        'reads_per_s': len(latencies['read']) / seconds,
+        'write_ms': summarize(latencies['write']),
+        'read_ms': summarize(latencies['read']),
+        'write_errors': errors['write'],
+        'read_errors': errors['read'],
+    }
+
+def main(argv=None):
+    from db import sqlite_pragmas
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--conversations', type=int, default=1000)
+    parser.add_argument('--seed-rows', type=int, default=100000, help='rows inserted before the run')
+    parser.add_argument('-o', '--output', default='-', help="JSON results file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    configs = [('rollback_journal', sqlite_pragmas(wal=False)), ('wal_tuned', sqlite_pragmas())]
+    results = {'meta': run_metadata(**vars(args)), 'configs': [
+        bench_config(name, pragmas, args.writers, args.readers, args.seconds, args.conversations, args.seed_rows)
+        for name, pragmas in configs]}
+    write_results(results, args.output)
+
+if __name__ == '__main__':
+    main()
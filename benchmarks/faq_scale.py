@@ -0,0 +1,101 @@
+"""
+FAQ retrieval scaling benchmark.
+
+Builds synthetic FAQ corpora of increasing size from data/faq_large.csv
+(paraphrased questions with product/category words mixed in, so the
+vocabulary grows with the corpus), then measures index build time, on-disk
+index open time, single-query latency and search_many throughput.
+
+    python -m benchmarks.faq_scale --sizes 10000,100000,1000000 -o faq_scale.json
+"""
+import time, random, argparse, tempfile, shutil
+from typing import Any, Dict, List, Tuple
+from benchmarks.common import load_faq_pairs, run_metadata, summarize, write_results
+
+PREFIXES = ['', 'hi, ', 'quick question: ', 'please tell me ', 'i was wondering ', 'hello team, ']
+PRODUCTS = ['laptop', 'headphones', 'sneakers', 'jacket', 'blender', 'phone case', 'backpack', 'monitor',
+            'coffee maker', 'desk lamp', 'yoga mat', 'smartwatch', 'kettle', 'camera', 'sofa', 'charger']
+REGIONS = ['in the us', 'in canada', 'in the uk', 'in germany', 'in india', 'in australia', 'for prime members', '']
+
+def synthetic_corpus(n: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    rng = random.Random(seed)
+    base = load_faq_pairs()
+    questions, answers = [], []
+    for i in range(n):
+        pair = base[i % len(base)]
+        q = pair['question'].rstrip('?')
+        questions.append(f"{rng.choice(PREFIXES)}{q} for my {rng.choice(PRODUCTS)} {rng.choice(REGIONS)} sku{i % 5003}?")
+        answers.append(f"{pair['answer']} (ref {i})")
+    return questions, answers
+
+def make_queries(n: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    base = [p['question'] for p in load_faq_pairs()]
+    return [f"{rng.choice(base).lower()} {rng.choice(PRODUCTS)}" for _ in range(n)]
+
+def bench_size(n: int, queries: List[str], batch_size: int, persist: bool) -> Dict[str, Any]:
+    from nlp.faq import FAQRetriever
+    from nlp.faq_index import FAQIndex, make_vectorizer, write_index, open_index
+
+    questions, answers = synthetic_corpus(n)
+    t0 = time.perf_counter()
+    vectorizer = make_vectorizer().fit(questions)
+    t1 = time.perf_counter()
+    index = FAQIndex.from_texts(questions, answers, vectorizer)
+    t2 = time.perf_counter()
+    result = {
+        'rows': n,
+        'vocab_size': len(vectorizer.vocabulary_),
+        'nnz': int(index.matrix_t.nnz),
+        'fit_seconds': t1 - t0,
+        'build_seconds': t2 - t1,
+    }
+
+    tmp = None
+    if persist:
+        tmp = tempfile.mkdtemp(prefix='faq-bench-')
+        t0 = time.perf_counter()
+        path = write_index(tmp, f'bench{n:016d}', questions, answers, vectorizer)
+        t1 = time.perf_counter()
+        index = open_index(path)
+        t2 = time.perf_counter()
+        result['write_seconds'] = t1 - t0
+        result['open_seconds'] = t2 - t1
+
+    faq = FAQRetriever(index=index)
+    faq.search(queries[0])  # warm-up
+
+    single = []
+    for q in queries:
+        started = time.perf_counter()
+        faq.search(q)
+        single.append(time.perf_counter() - started)
+    result['search_ms'] = summarize(single)
+
+    started = time.perf_counter()
+    for i in range(0, len(queries), batch_size):
+        faq.search_many(queries[i:i + batch_size], k=5)
+    elapsed = time.perf_counter() - started
+    result['search_many_queries_per_s'] = len(queries) / elapsed if elapsed else 0.0
+
+    if tmp:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000', help='comma-separated corpus sizes (up to 1000000)')
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--persist', action='store_true', help='also time writing and memory-mapping the on-disk index')
+    parser.add_argument('-o', '--output', default='-', help="JSON results file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    queries = make_queries(args.queries)
+    results = {'meta': run_metadata(**vars(args)), 'sizes': []}
+    for n in [int(s) for s in args.sizes.split(',') if s]:
+        results['sizes'].append(bench_size(n, queries, args.batch_size, args.persist))
+    write_results(results, args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+End-to-end load and latency benchmark for the chat pipeline.
+
+Drives /chat with traffic generated from data/intents.json and
+data/faq_large.csv, either in-process (ASGI transport, no network) or against
+a local uvicorn server, at one or more concurrency levels. The OpenAI fallback
+is pointed at the fake server in tests/fake_llm.py. Reports req/s and
+p50/p95/p99 latency overall, plus per-stage latency of the NLU pipeline.
+
+    python -m benchmarks.load --mode both --requests 2000 --concurrency 1,8,32 -o load.json
+"""
+import os, sys, time, socket, asyncio, argparse, tempfile, subprocess
+from typing import Any, Dict, List
+import httpx
+from benchmarks.common import ROOT_DIR, generate_traffic, run_metadata, summarize, write_results
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_server(module: str, port: int, env: Dict[str, str], ready_path: str, workers: int = 1, timeout: float = 120.0):
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', module, '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning'],
+        cwd=ROOT_DIR, env=env,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'{module} exited with code {proc.returncode}')
+        try:
+            if httpx.get(f'http://127.0.0.1:{port}{ready_path}', timeout=1.0).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f'{module} not ready after {timeout}s')
+
+def bench_env(llm_port: int, llm_delay: float) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='chatbot-bench-'), 'bench.db'))
+    env['OPENAI_API_KEY'] = 'bench'
+    env['OPENAI_API_BASE'] = f'http://127.0.0.1:{llm_port}/v1'
+    env['FAKE_LLM_DELAY'] = str(llm_delay)
+    return env
+
+async def drive(client: httpx.AsyncClient, traffic: List[Dict[str, str]], concurrency: int) -> Dict[str, Any]:
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for req in traffic:
+        queue.put_nowait(req)
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                req = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                r = await client.post('/chat', json=req)
+                if r.status_code != 200:
+                    errors += 1
+                    continue
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'concurrency': concurrency,
+        'requests': len(traffic),
+        'errors': errors,
+        'seconds': elapsed,
+        'req_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_ms': summarize(latencies),
+    }
+
+def stage_profile(app_module, traffic: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Time each NLU stage directly (no HTTP, no caches) over the same traffic."""
+    from nlp.ner import extract_entities
+    bundle = app_module.registry.get('models')
+    policy = app_module.policy
+    timings = {'classify_intent': [], 'extract_entities': [], 'faq_search': [], 'policy_decide': []}
+    for req in traffic:
+        text = req['message']
+        t0 = time.perf_counter()
+        intent, conf, _ = bundle.nlp.classify_intent(text)
+        t1 = time.perf_counter()
+        entities = extract_entities(text)
+        t2 = time.perf_counter()
+        faq = bundle.faq.search(text)
+        t3 = time.perf_counter()
+        policy.decide(intent=intent, confidence=conf, entities=entities, faq=faq)
+        t4 = time.perf_counter()
+        timings['classify_intent'].append(t1 - t0)
+        timings['extract_entities'].append(t2 - t1)
+        timings['faq_search'].append(t3 - t2)
+        timings['policy_decide'].append(t4 - t3)
+    return {stage: summarize(xs) for stage, xs in timings.items()}
+
+def run_inprocess(traffic, levels, env) -> Dict[str, Any]:
+    os.environ.update({k: v for k, v in env.items() if k in ('DATABASE_URL', 'OPENAI_API_KEY', 'OPENAI_API_BASE')})
+    import app as app_module
+    app_module.registry.warm_up()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=60.0) as client:
+            return [await drive(client, traffic, c) for c in levels]
+    runs = asyncio.run(run())
+    return {'runs': runs, 'stages_ms': stage_profile(app_module, traffic)}
+
+def run_server(traffic, levels, env, workers: int) -> Dict[str, Any]:
+    port = free_port()
+    proc = start_server('app:app', port, env, '/ready', workers=workers)
+    try:
+        async def run():
+            limits = httpx.Limits(max_connections=max(levels))
+            async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', timeout=60.0, limits=limits) as client:
+                return [await drive(client, traffic, c) for c in levels]
+        return {'runs': asyncio.run(run()), 'server_workers': workers}
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=('inprocess', 'server', 'both'), default='inprocess')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', default='1,8,32', help='comma-separated concurrency levels')
+    parser.add_argument('--faq-share', type=float, default=0.3, help='fraction of traffic that is FAQ questions')
+    parser.add_argument('--llm-delay', type=float, default=0.05, help='fake LLM response delay in seconds')
+    parser.add_argument('--server-workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='-', help="JSON results file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    levels = [int(c) for c in args.concurrency.split(',') if c]
+    traffic = generate_traffic(args.requests, seed=args.seed, faq_share=args.faq_share)
+    llm_port = free_port()
+    env = bench_env(llm_port, args.llm_delay)
+    llm = start_server('tests.fake_llm:app', llm_port, env, '/docs')
+    results = {'meta': run_metadata(**vars(args))}
+    try:
+        if args.mode in ('server', 'both'):
+            results['server'] = run_server(traffic, levels, env, args.server_workers)
+        if args.mode in ('inprocess', 'both'):
+            results['inprocess'] = run_inprocess(traffic, levels, env)
+    finally:
+        llm.terminate()
+        llm.wait()
+    write_results(results, args.output)
+
+if __name__ == '__main__':
+    main()
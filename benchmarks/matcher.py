@@ -0,0 +1,107 @@
+"""
+Keyword and entity matcher microbenchmark.
+
+Grows the keyword lists and the number of entity definitions and compares the
+compiled single-pass matchers in nlp/matcher.py with the naive approaches they
+replace (a whole-word regex search per keyword, one findall per entity regex), over
+messages generated from data/intents.json.
+
+    python -m benchmarks.matcher --patterns 10,100,1000,10000 -o matcher.json
+"""
+import re, time, random, string, argparse
+from typing import Any, Dict, List
+from benchmarks.common import generate_traffic, run_metadata, write_results
+
+def synthetic_keywords(n: int, labels: int = 10, seed: int = 0) -> Dict[str, List[str]]:
+    rng = random.Random(seed)
+    words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))) for _ in range(n)]
+    keywords: Dict[str, List[str]] = {f'label{i}': [] for i in range(labels)}
+    for i, w in enumerate(words):
+        keywords[f'label{i % labels}'].append(w if rng.random() < 0.7 else f'{w} {rng.choice(words)}')
+    return keywords
+
+def synthetic_entities(n: int) -> List[Dict[str, str]]:
+    from nlp.ner import ENTITY_DEFS
+    import json
+    with open(ENTITY_DEFS) as f:
+        base = json.load(f)['entities']
+    # SKU-like codes with distinct prefixes, standing in for new entity types
+    extra = [{'name': f'code{i}', 'pattern': rf'\b{chr(65 + i % 26)}{chr(65 + i // 26 % 26)}{i}-\d{{4,6}}\b'}
+             for i in range(max(0, n - len(base)))]
+    return base + extra
+
+def compile_keywords(keywords: Dict[str, List[str]]) -> List:
+    from nlp.matcher import keyword_pattern
+    return [(lab, [re.compile(keyword_pattern(kw)) for kw in kws]) for lab, kws in keywords.items()]
+
+def naive_keywords(compiled: List, text: str):
+    low = text.lower()
+    for lab, patterns in compiled:
+        for pattern in patterns:
+            if pattern.search(low):
+                return lab
+    return None
+
+def naive_entities(compiled: List, text: str):
+    found = {}
+    for name, pattern in compiled:
+        hits = pattern.findall(text)
+        if hits:
+            found[name] = hits[0]
+    return found
+
+def per_message_us(fn, messages: List[str], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for m in messages:
+            fn(m)
+    return (time.perf_counter() - started) * 1e6 / (repeat * len(messages))
+
+def bench_keywords(n: int, messages: List[str], repeat: int) -> Dict[str, Any]:
+    from nlp.matcher import KeywordMatcher
+    keywords = synthetic_keywords(n)
+    t0 = time.perf_counter()
+    matcher = KeywordMatcher(keywords)
+    build = time.perf_counter() - t0
+    compiled = compile_keywords(keywords)
+    assert all(matcher.best(m) == naive_keywords(compiled, m) for m in messages[:200])
+    return {
+        'patterns': n,
+        'build_ms': build * 1000.0,
+        'naive_us': per_message_us(lambda m: naive_keywords(compiled, m), messages, repeat),
+        'compiled_us': per_message_us(matcher.best, messages, repeat),
+    }
+
+def bench_entities(n: int, messages: List[str], repeat: int) -> Dict[str, Any]:
+    from nlp.matcher import PatternMatcher
+    defs = synthetic_entities(n)
+    compiled = [(d['name'], re.compile(d['pattern'])) for d in defs]
+    t0 = time.perf_counter()
+    matcher = PatternMatcher.from_definitions(defs)
+    build = time.perf_counter() - t0
+    return {
+        'patterns': len(defs),
+        'build_ms': build * 1000.0,
+        'naive_us': per_message_us(lambda m: naive_entities(compiled, m), messages, repeat),
+        'compiled_us': per_message_us(matcher.first, messages, repeat),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--patterns', default='10,100,1000', help='comma-separated keyword counts')
+    parser.add_argument('--entity-patterns', default='3,10,30,90', help='comma-separated entity definition counts')
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', default='-', help="JSON results file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    messages = [r['message'] for r in generate_traffic(args.messages, faq_share=0.3)]
+    results = {
+        'meta': run_metadata(**vars(args)),
+        'keywords': [bench_keywords(int(n), messages, args.repeat) for n in args.patterns.split(',') if n],
+        'entities': [bench_entities(int(n), messages, args.repeat) for n in args.entity_patterns.split(',') if n],
+    }
+    write_results(results, args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Zero-shot backend latency: the PyTorch pipeline vs the ONNX Runtime export.
+
+Times both backends on the same intent examples, one call per batch of
+messages, and reports p50/p95/p99 per batch size plus the p50 speedup. The
+model is exported (int8 unless --no-quantize) into a temporary directory
+unless --onnx-dir points at an existing export of the same model.
+
+    python -m benchmarks.onnx_zero_shot --batch-sizes 1,8 -o onnx.json
+"""
+import os, time, argparse, tempfile, shutil
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from benchmarks.common import load_intent_examples, run_metadata, summarize, write_results
+
+def time_backend(fn: Callable, messages: List[str], labels: Sequence[str], batch_size: int, repeat: int) -> Dict[str, float]:
+    batches = [messages[i:i + batch_size] for i in range(0, len(messages), batch_size)]
+    fn(batches[0], list(labels))  # warm-up
+    latencies = []
+    for _ in range(repeat):
+        for batch in batches:
+            started = time.perf_counter()
+            fn(batch, list(labels))
+            latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+def bench_backends(model: str, onnx_dir: str, messages: List[str], labels: Sequence[str],
+                   batch_sizes: Sequence[int], repeat: int = 3) -> List[Dict[str, Any]]:
+    from transformers import pipeline
+    from nlp.onnx_backend import OnnxZeroShot
+    torch_fn = pipeline('zero-shot-classification', model=model, tokenizer=model)
+    onnx_fn = OnnxZeroShot(onnx_dir)
+    results = []
+    for batch_size in batch_sizes:
+        torch_ms = time_backend(torch_fn, messages, labels, batch_size, repeat)
+        onnx_ms = time_backend(onnx_fn, messages, labels, batch_size, repeat)
+        results.append({
+            'batch_size': batch_size,
+            'torch_ms': torch_ms,
+            'onnx_ms': onnx_ms,
+            'speedup_p50': torch_ms['p50'] / onnx_ms['p50'] if onnx_ms['p50'] else 0.0,
+        })
+    return results
+
+def main(argv=None):
+    from nlp.advanced_nlp import ZERO_SHOT_MODEL
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=ZERO_SHOT_MODEL, help='NLI model (hub id or local path)')
+    parser.add_argument('--onnx-dir', default=None, help='existing export of --model (default: export to a temp dir)')
+    parser.add_argument('--no-quantize', action='store_true', help='export fp32 instead of int8')
+    parser.add_argument('--messages', type=int, default=32)
+    parser.add_argument('--batch-sizes', default='1,8')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', default='-', help="JSON results file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    examples = load_intent_examples()
+    messages = [e['message'] for e in examples][:args.messages]
+    labels = sorted({e['intent'] for e in examples})
+    tmp: Optional[str] = None
+    onnx_dir = args.onnx_dir
+    if onnx_dir is None:
+        from nlp.onnx_backend import export_onnx
+        tmp = tempfile.mkdtemp(prefix='onnx-bench-')
+        onnx_dir = os.path.join(tmp, 'export')
+        export_onnx(args.model, onnx_dir, quantize=not args.no_quantize)
+    try:
+        results = {'meta': run_metadata(**vars(args)),
+                   'batches': bench_backends(args.model, onnx_dir, messages, labels,
+                                             [int(s) for s in args.batch_sizes.split(',') if s], args.repeat)}
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+    write_results(results, args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Overload benchmark for admission control.
+
+Drives /chat in-process far above what the expensive tiers can serve: the
+zero-shot model is replaced by a stand-in that runs one call at a time for
+--zero-shot-ms per message (one saturated core), and low-confidence replies go
+to the fake LLM in tests/fake_llm.py with --llm-delay and --llm-concurrency
+admitted calls. The same traffic runs with admission control off (everything
+queues) and on (excess load degrades to keyword + FAQ/policy), reporting
+p50/p95/p99 latency, the degraded share and the gate counters.
+
+    python -m benchmarks.overload --requests 600 --concurrency 64 -o overload.json
+"""
+import os, time, asyncio, argparse, threading
+from typing import Any, Dict, List
+import httpx
+from benchmarks.common import generate_traffic, run_metadata, summarize, write_results
+from benchmarks.load import bench_env, free_port, start_server
+
+class SerialZeroShot:
+    """Zero-shot stand-in: one call at a time, delay seconds per text, low confidence unless a keyword hits."""
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, texts, labels, batch_size=None):
+        from nlp.advanced_nlp import _KEYWORD_MATCHER
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        with self._lock:
+            time.sleep(self.delay * len(texts))
+        out = []
+        for text in texts:
+            best = _KEYWORD_MATCHER.best(text)
+            top, score = (best, 0.9) if best in labels else ('complaint', 0.45)
+            rest = [l for l in labels if l != top]
+            out.append({'sequence': text, 'labels': [top] + rest,
+                        'scores': [score] + [(1.0 - score) / len(rest)] * len(rest)})
+        return out
+
+async def drive(client: httpx.AsyncClient, traffic: List[Dict[str, str]], concurrency: int) -> Dict[str, Any]:
+    latencies, degraded_latencies, errors, degraded = [], [], 0, 0
+    queue = asyncio.Queue()
+    for req in traffic:
+        queue.put_nowait(req)
+
+    async def worker():
+        nonlocal errors, degraded
+        while True:
+            try:
+                req = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                r = await client.post('/chat', json=req)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            if r.status_code != 200:
+                errors += 1
+                continue
+            elapsed = time.perf_counter() - started
+            latencies.append(elapsed)
+            if r.json().get('degraded'):
+                degraded += 1
+                degraded_latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'concurrency': concurrency,
+        'requests': len(traffic),
+        'errors': errors,
+        'seconds': elapsed,
+        'req_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'degraded_share': degraded / len(latencies) if latencies else 0.0,
+        'latency_ms': summarize(latencies),
+        'degraded_latency_ms': summarize(degraded_latencies),
+    }
+
+def configure(app_module, admission: bool, args):
+    from nlp.admission import AdmissionGate, AsyncAdmissionGate
+    nlp = app_module.registry.get('models').nlp
+    nlp.zero_shot = SerialZeroShot(args.zero_shot_ms / 1000.0)
+    nlp.batcher = None
+    nlp.admission = AdmissionGate('zero_shot', args.zero_shot_concurrency, max_queue=args.zero_shot_queue,
+                                  max_wait_ms=args.max_wait_ms) if admission else None
+    app_module.llm_gate = AsyncAdmissionGate('llm', args.llm_concurrency, max_queue=args.llm_queue,
+                                             max_wait_ms=args.max_wait_ms) if admission else None
+    # Every message must reach the classifier for the load to be real
+    app_module.nlu_cache.max_entries = 0
+    app_module.sessions = None
+    return nlp
+
+def run(traffic, args, env) -> Dict[str, Any]:
+    os.environ.update({k: v for k, v in env.items() if k in ('DATABASE_URL', 'OPENAI_API_KEY', 'OPENAI_API_BASE')})
+    import app as app_module
+    app_module.registry.warm_up()
+
+    async def drive_app():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=120.0) as client:
+            return await drive(client, traffic, args.concurrency)
+
+    results = {}
+    for name, admission in (('unbounded', False), ('admission', True)):
+        nlp = configure(app_module, admission, args)
+        result = asyncio.run(drive_app())
+        result['gates'] = {
+            'zero_shot': nlp.admission.stats() if nlp.admission else {},
+            'llm': app_module.llm_gate.stats() if app_module.llm_gate else {},
+        }
+        results[name] = result
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=600)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--faq-share', type=float, default=0.3)
+    parser.add_argument('--zero-shot-ms', type=float, default=20.0, help='zero-shot cost per message (serialized)')
+    parser.add_argument('--zero-shot-concurrency', type=int, default=2)
+    parser.add_argument('--zero-shot-queue', type=int, default=4)
+    parser.add_argument('--llm-delay', type=float, default=0.25, help='fake LLM response delay in seconds')
+    parser.add_argument('--llm-concurrency', type=int, default=8)
+    parser.add_argument('--llm-queue', type=int, default=8)
+    parser.add_argument('--max-wait-ms', type=float, default=50.0, help='queue wait budget at both gates')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='-', help="JSON results file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    traffic = generate_traffic(args.requests, seed=args.seed, faq_share=args.faq_share)
+    llm_port = free_port()
+    env = bench_env(llm_port, args.llm_delay)
+    llm = start_server('tests.fake_llm:app', llm_port, env, '/docs')
+    try:
+        results = {'meta': run_metadata(**vars(args)), **run(traffic, args, env)}
+    finally:
+        llm.terminate()
+        llm.wait()
+    write_results(results, args.output)
+
+if __name__ == '__main__':
+    main()
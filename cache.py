@@ -0,0 +1,219 @@
+import re, sys, time, threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional
+from nlp.ner import ENTITY_MATCHER
+
+_PUNCT_RE = re.compile(r"[^\w<>]+")
+
+def _turn_size(user: str, bot: str) -> int:
+    return sys.getsizeof(user or '') + sys.getsizeof(bot or '') + 64
+
+class _Conversation:
+    __slots__ = ('turns', 'size', 'loaded', 'touched')
+
+    def __init__(self, max_turns: int):
+        self.turns = deque(maxlen=max_turns)
+        self.size = 0
+        self.loaded = False
+        self.touched = time.monotonic()
+
+class HistoryCache:
+    """
+    Per-conversation ring buffer of recent (user, bot) turns in front of the
+    ConversationLog history query.
+    - append() records every logged turn; get() answers from memory and returns
+      None on a cold miss, after which the caller loads the DB rows and fill()s them.
+    - Conversations are evicted least-recently-used once the cache exceeds
+      max_bytes, and dropped after ttl seconds without access.
+    """
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 1800.0, max_turns: int = 16):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_turns = max_turns
+        self._data: 'OrderedDict[str, _Conversation]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, conv_id: str):
+        entry = self._data.pop(conv_id)
+        self._bytes -= entry.size
+
+    def _push(self, entry: _Conversation, user: str, bot: str):
+        if len(entry.turns) == entry.turns.maxlen:
+            old = entry.turns[0]
+            entry.size -= _turn_size(old['user'], old['bot'])
+            self._bytes -= _turn_size(old['user'], old['bot'])
+        entry.turns.append({'user': user, 'bot': bot})
+        size = _turn_size(user, bot)
+        entry.size += size
+        self._bytes += size
+
+    def _evict(self, now: float):
+        # Oldest-touched entries sit at the front of the OrderedDict.
+        while self._data:
+            conv_id, entry = next(iter(self._data.items()))
+            if now - entry.touched > self.ttl:
+                self._drop(conv_id)
+                self.expirations += 1
+            elif self._bytes > self.max_bytes:
+                self._drop(conv_id)
+                self.evictions += 1
+            else:
+                break
+
+    def get(self, conv_id: str, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(conv_id)
+            if entry is not None and now - entry.touched > self.ttl:
+                self._drop(conv_id)
+                self.expirations += 1
+                entry = None
+            if entry is None or not entry.loaded or limit > self.max_turns:
+                self.misses += 1
+                return None
+            entry.touched = now
+            self._data.move_to_end(conv_id)
+            self.hits += 1
+            turns = list(entry.turns)
+        return turns[-limit:] if limit > 0 else []
+
+    def append(self, conv_id: str, user: str, bot: str):
+        if not conv_id:
+            return
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(conv_id)
+            if entry is None:
+                # Not loaded from the DB yet: the turn is kept and merged in on the next fill().
+                entry = self._data[conv_id] = _Conversation(self.max_turns)
+            self._push(entry, user, bot)
+            entry.touched = now
+            self._data.move_to_end(conv_id)
+            self._evict(now)
+
+    def fill(self, conv_id: str, turns: List[Dict[str, Any]]):
+        """Install DB history for conv_id, keeping any turns appended that the DB did not have yet."""
+        if not conv_id:
+            return
+        now = time.monotonic()
+        with self._lock:
+            pending = []
+            entry = self._data.get(conv_id)
+            if entry is not None:
+                if entry.loaded:
+                    return
+                pending = list(entry.turns)
+                self._drop(conv_id)
+            # Skip pending turns already present at the tail of the DB rows.
+            overlap = 0
+            for k in range(min(len(pending), len(turns)), 0, -1):
+                if turns[-k:] == pending[:k]:
+                    overlap = k
+                    break
+            entry = self._data[conv_id] = _Conversation(self.max_turns)
+            for t in list(turns) + pending[overlap:]:
+                self._push(entry, t.get('user'), t.get('bot'))
+            entry.loaded = True
+            entry.touched = now
+            self._evict(now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'conversations': len(self._data),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+def normalize_message(text: str) -> str:
+    """Cache key for a message: entity spans masked, case, punctuation and whitespace folded."""
+    text = ENTITY_MATCHER.mask(text.lower())
+    return ' '.join(_PUNCT_RE.sub(' ', text).split())
+
+class NLUCache:
+    """
+    LRU + TTL cache of NLU results (intent, confidence, FAQ answer/score) keyed
+    on normalize_message(text). Entities are not cached; callers re-extract them
+    from the original text.
+    - version_fn returns a fingerprint of the model/FAQ artifacts; it is checked
+      at most every check_interval seconds and the cache is cleared when it changes.
+    - put() may tag an entry with the model version that produced it; get() with a
+      version treats entries from any other version as misses, so a request still
+      running on a retired model cannot repopulate the cache after a clear().
+    """
+    def __init__(self, max_entries: int = 10000, ttl: float = 600.0,
+                 version_fn: Optional[Callable[[], Any]] = None, check_interval: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version_fn = version_fn
+        self.check_interval = check_interval
+        self._data: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = version_fn() if version_fn else None
+        self._checked = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_version(self, now: float):
+        if self.version_fn is None or now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        version = self.version_fn()
+        if version != self._version:
+            self._version = version
+            self._data.clear()
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def get(self, text: str, version: Any = None) -> Optional[Any]:
+        if self.max_entries <= 0:
+            return None
+        key = normalize_message(text)
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(now)
+            item = self._data.get(key)
+            if item is None or now - item[0] > self.ttl or (version is not None and item[2] != version):
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, text: str, value: Any, version: Any = None):
+        if self.max_entries <= 0:
+            return
+        key = normalize_message(text)
+        with self._lock:
+            self._data[key] = (time.monotonic(), value, version)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits / lookups) if lookups else 0.0,
+                'invalidations': self.invalidations,
+            }
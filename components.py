@@ -0,0 +1,110 @@
+import threading, time, logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class LazyComponent:
+    """A component built by its factory on first use (thread-safe, built once)."""
+    def __init__(self, name: str, factory: Callable[[], Any], warmup: Optional[Callable[[Any], Any]] = None):
+        self.name = name
+        self.factory = factory
+        self.warmup = warmup
+        self._value = None
+        self._loaded = False
+        self._warm = False
+        self._error = None
+        self._load_seconds = None
+        self._reloads = 0
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    def get(self) -> Any:
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                started = time.perf_counter()
+                try:
+                    self._value = self.factory()
+                except Exception as e:
+                    self._error = repr(e)
+                    raise
+                self._load_seconds = time.perf_counter() - started
+                self._error = None
+                self._loaded = True
+        return self._value
+
+    def peek(self) -> Any:
+        """The instance if it has been built, without triggering a build."""
+        return self._value if self._loaded else None
+
+    def warm_up(self):
+        value = self.get()
+        if self.warmup and not self._warm:
+            self.warmup(value)
+        self._warm = True
+
+    def reload(self) -> Tuple[Any, Any]:
+        """
+        Build and warm up a fresh instance while the current one keeps serving,
+        then swap it in with a single assignment. Returns (old, new).
+        """
+        with self._reload_lock:
+            started = time.perf_counter()
+            value = self.factory()
+            if self.warmup:
+                self.warmup(value)
+            with self._lock:
+                old = self._value
+                self._value = value
+                self._loaded = True
+                self._warm = True
+                self._error = None
+                self._load_seconds = time.perf_counter() - started
+                self._reloads += 1
+        return old, value
+
+    def status(self) -> Dict[str, Any]:
+        return {'loaded': self._loaded, 'warm': self._warm, 'load_seconds': self._load_seconds,
+                'reloads': self._reloads, 'error': self._error}
+
+class ComponentRegistry:
+    """
+    Defers construction of heavy components (models, indexes, DB schema) until
+    first use. warm_up_async() builds everything in a background thread and runs
+    each component's warm-up inference; ready() turns true once all are warm.
+    """
+    def __init__(self):
+        self._components: Dict[str, LazyComponent] = {}
+        self._thread = None
+
+    def register(self, name: str, factory: Callable[[], Any], warmup: Optional[Callable[[Any], Any]] = None):
+        self._components[name] = LazyComponent(name, factory, warmup)
+
+    def get(self, name: str) -> Any:
+        return self._components[name].get()
+
+    def peek(self, name: str) -> Any:
+        return self._components[name].peek()
+
+    def reload(self, name: str) -> Tuple[Any, Any]:
+        return self._components[name].reload()
+
+    def warm_up(self):
+        for component in self._components.values():
+            try:
+                component.warm_up()
+            except Exception:
+                logger.exception('Warm-up of %s failed', component.name)
+
+    def warm_up_async(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.warm_up, name='component-warmup', daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def ready(self) -> bool:
+        return all(c.status()['warm'] for c in self._components.values())
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: c.status() for name, c in self._components.items()}
@@ -0,0 +1,203 @@
+import os, json, gzip, argparse, datetime, itertools
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, event, inspect, text, Column, Index, Integer, String, Text, Float, DateTime
+from sqlalchemy.orm import sessionmaker, declarative_base
+
+DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///./chatbot.db')
+
+# Connection pool (per process) and SQLite tuning
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '8'))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '8'))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_CACHE_KB = int(os.environ.get('SQLITE_CACHE_KB', '16384'))
+SQLITE_MMAP_BYTES = int(os.environ.get('SQLITE_MMAP_BYTES', str(256 * 1024 * 1024)))
+
+ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive'))
+
+def sqlite_pragmas(wal: bool = True) -> Dict[str, Any]:
+    """
+    WAL lets readers run alongside the single writer; synchronous=NORMAL is
+    durable across application crashes in WAL mode and skips an fsync per
+    commit; busy_timeout makes a blocked writer wait instead of failing.
+    """
+    if not wal:
+        return {'journal_mode': 'DELETE', 'busy_timeout': SQLITE_BUSY_TIMEOUT_MS}
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': SQLITE_BUSY_TIMEOUT_MS,
+        'cache_size': -SQLITE_CACHE_KB,
+        'mmap_size': SQLITE_MMAP_BYTES,
+        'temp_store': 'MEMORY',
+    }
+
+def make_engine(url: str = DATABASE_URL, pragmas: Optional[Dict[str, Any]] = None,
+                pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW):
+    if not url.startswith('sqlite'):
+        return create_engine(url, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+    if ':memory:' in url or url.rstrip('/') == 'sqlite:':
+        return create_engine(url, connect_args={'check_same_thread': False})
+    engine = create_engine(url, connect_args={'check_same_thread': False},
+                           pool_size=pool_size, max_overflow=max_overflow)
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cur.execute(f'PRAGMA {name}={value}')
+        cur.close()
+
+    return engine
+
+engine = make_engine()
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+Base = declarative_base()
+
+class ConversationLog(Base):
+    __tablename__ = 'conversation_logs'
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+    user_id = Column(String(128), index=True)
+    conversation_id = Column(String(128))
+    user_message = Column(Text)
+    bot_reply = Column(Text)
+    intent = Column(String(64))
+    confidence = Column(Float)
+    entities = Column(Text)
+    model_version = Column(String(64))
+    outcome = Column(String(16))  # faq | llm | escalated | policy
+    ticket_id = Column(Integer)
+
+    __table_args__ = (
+        # History lookup: WHERE conversation_id = ? ORDER BY id DESC LIMIT n. Not covering: the query
+        # reads user_message/bot_reply, and copying those texts into the index would double the log's
+        # size. The index removes the scan and the sort; only the n rows returned are fetched by rowid.
+        Index('ix_conversation_logs_conversation_id_id', 'conversation_id', id.desc()),
+    )
+
+class Ticket(Base):
+    __tablename__ = 'tickets'
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    user_id = Column(String(128), index=True)
+    conversation_id = Column(String(128), index=True)
+    subject = Column(String(256))
+    details = Column(Text)
+    status = Column(String(32), default='open')
+
+class AnalyticsRollup(Base):
+    """Per-hour, per-intent aggregates of logged turns, maintained by analytics.py."""
+    __tablename__ = 'analytics_hourly'
+    bucket = Column(DateTime, primary_key=True)
+    intent = Column(String(64), primary_key=True)
+    turns = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+    faq_answers = Column(Integer, nullable=False, default=0)
+    llm_replies = Column(Integer, nullable=False, default=0)
+    escalations = Column(Integer, nullable=False, default=0)
+    tickets = Column(Integer, nullable=False, default=0)
+
+# Columns added after the first release; existing databases get them on init_db()
+_ADDED_COLUMNS = {
+    'conversation_logs': {'model_version': 'VARCHAR(64)', 'outcome': 'VARCHAR(16)', 'ticket_id': 'INTEGER'},
+}
+
+# Indexes from earlier releases that duplicate the primary key or the composite history index,
+# plus ticket indexes an earlier version of this module added that no query uses
+_DROPPED_INDEXES = (
+    'ix_conversation_logs_id', 'ix_conversation_logs_conversation_id', 'ix_tickets_id',
+    'ix_tickets_conversation_status', 'ix_tickets_user_status',
+)
+
+def _add_missing_columns():
+    insp = inspect(engine)
+    for table, columns in _ADDED_COLUMNS.items():
+        if not insp.has_table(table):
+            continue
+        existing = {c['name'] for c in insp.get_columns(table)}
+        with engine.begin() as conn:
+            for name, ddl in columns.items():
+                if name not in existing:
+                    conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {ddl}'))
+
+def _sync_indexes():
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        for name in _DROPPED_INDEXES:
+            conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
+
+def init_db():
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    _sync_indexes()
+
+def _log_row(r: ConversationLog) -> Dict[str, Any]:
+    row = {c.name: getattr(r, c.name) for c in ConversationLog.__table__.columns}
+    row['timestamp'] = r.timestamp.isoformat() if r.timestamp else None
+    return row
+
+def archive_logs(older_than: datetime.timedelta, archive_dir: str = ARCHIVE_DIR, batch_size: int = 10000,
+                 session_factory=SessionLocal) -> Dict[str, Any]:
+    """
+    Move ConversationLog rows older than the cutoff into gzipped JSONL files,
+    one file per batch (conversation_logs-<first id>-<last id>.jsonl.gz). Rows
+    are read in id order, which is insertion order, and the scan stops at the
+    first row inside the retention window, so no timestamp index is needed.
+    Each file is fsynced and renamed into place before its rows are deleted.
+    """
+    cutoff = datetime.datetime.utcnow() - older_than
+    os.makedirs(archive_dir, exist_ok=True)
+    archived, files = 0, []
+    while True:
+        with session_factory() as db:
+            rows = db.query(ConversationLog).order_by(ConversationLog.id).limit(batch_size).all()
+            old = list(itertools.takewhile(lambda r: r.timestamp is not None and r.timestamp < cutoff, rows))
+            if not old:
+                break
+            first, last = old[0].id, old[-1].id
+            path = os.path.join(archive_dir, f'conversation_logs-{first:012d}-{last:012d}.jsonl.gz')
+            tmp = path + '.tmp'
+            with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+                for r in old:
+                    f.write(json.dumps(_log_row(r)) + '\n')
+            with open(tmp, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+            # old is the lowest-id prefix of the table and new rows only get higher ids
+            db.query(ConversationLog).filter(ConversationLog.id <= last).delete(synchronize_session=False)
+            db.commit()
+        archived += len(old)
+        files.append(path)
+        if len(old) < batch_size:
+            break
+    return {'archived_rows': archived, 'files': files, 'cutoff': cutoff.isoformat()}
+
+def compact(vacuum: bool = False):
+    """Checkpoint and truncate the WAL and refresh planner stats; VACUUM (exclusive lock) returns freed pages to the OS."""
+    if engine.url.get_backend_name() != 'sqlite':
+        return
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+        if vacuum:
+            conn.exec_driver_sql('VACUUM')
+        conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.exec_driver_sql('PRAGMA optimize')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Archive old conversation logs and compact the database.')
+    parser.add_argument('--older-than-days', type=float, default=float(os.environ.get('LOG_RETENTION_DAYS', '90')))
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    parser.add_argument('--batch-size', type=int, default=10000, help='rows per archive file')
+    parser.add_argument('--vacuum', action='store_true', help='also VACUUM (blocks writers while it runs)')
+    args = parser.parse_args(argv)
+
+    init_db()
+    result = archive_logs(datetime.timedelta(days=args.older_than_days), args.archive_dir, args.batch_size)
+    compact(vacuum=args.vacuum)
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import os, json, asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+SYSTEM_PROMPT = "You are a helpful customer support assistant for an e-commerce store. Be concise and friendly."
+
+class LLMClient:
+    """
+    Non-blocking client for an OpenAI-compatible /chat/completions endpoint.
+    - complete() awaits the whole reply, bounded by `timeout` seconds.
+    - stream() yields content deltas as they arrive (server-sent events).
+    Both return/yield nothing on errors or timeouts so the caller can fall back
+    to the dialog policy. Cancelling the awaiting task closes the upstream request.
+    Point base_url at a local fake server (see tests/fake_llm.py) for testing.
+    httpx is an optional dependency, imported only when a client is built.
+    """
+    def __init__(self, api_key: str, base_url: str = 'https://api.openai.com/v1', model: str = 'gpt-3.5-turbo',
+                 timeout: float = 10.0, max_tokens: int = 200, temperature: float = 0.2,
+                 transport: Optional[Any] = None):
+        try:
+            import httpx
+        except ImportError:
+            raise RuntimeError('The LLM fallback needs httpx (pip install -r requirements_additional.txt), '
+                               'or unset OPENAI_API_KEY to run without it') from None
+        self.model = model
+        self.timeout = timeout
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip('/'),
+            headers={'Authorization': f'Bearer {api_key}'},
+            timeout=httpx.Timeout(timeout),
+            transport=transport,
+        )
+
+    @classmethod
+    def from_env(cls) -> Optional['LLMClient']:
+        key = os.environ.get("OPENAI_API_KEY") or os.environ.get("OPENAI_API")
+        if not key:
+            return None
+        return cls(
+            api_key=key,
+            base_url=os.environ.get('OPENAI_API_BASE', 'https://api.openai.com/v1'),
+            model=os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo'),
+            timeout=float(os.environ.get('LLM_TIMEOUT', '10')),
+        )
+
+    @staticmethod
+    def build_messages(message: str, history: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        msgs = [{"role": "system", "content": SYSTEM_PROMPT}]
+        for turn in history:
+            if 'user' in turn and turn['user']:
+                msgs.append({"role": "user", "content": turn['user']})
+            if 'bot' in turn and turn['bot']:
+                msgs.append({"role": "assistant", "content": turn['bot']})
+        msgs.append({"role": "user", "content": message})
+        return msgs
+
+    def _payload(self, message: str, history: List[Dict[str, Any]], stream: bool) -> Dict[str, Any]:
+        return {
+            'model': self.model,
+            'messages': self.build_messages(message, history),
+            'max_tokens': self.max_tokens,
+            'temperature': self.temperature,
+            'stream': stream,
+        }
+
+    async def _complete(self, message: str, history: List[Dict[str, Any]]) -> str:
+        r = await self._client.post('/chat/completions', json=self._payload(message, history, stream=False))
+        r.raise_for_status()
+        return r.json()['choices'][0]['message']['content'].strip()
+
+    async def complete(self, message: str, history: List[Dict[str, Any]]) -> str:
+        try:
+            return await asyncio.wait_for(self._complete(message, history), self.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return ""
+
+    async def stream(self, message: str, history: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        # httpx's read timeout bounds the wait for each chunk, so a stalled stream ends too.
+        try:
+            async with self._client.stream('POST', '/chat/completions',
+                                           json=self._payload(message, history, stream=True)) as r:
+                r.raise_for_status()
+                async for line in r.aiter_lines():
+                    if not line.startswith('data:'):
+                        continue
+                    data = line[len('data:'):].strip()
+                    if data == '[DONE]':
+                        break
+                    delta = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                    if delta:
+                        yield delta
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return
+
+    async def aclose(self):
+        await self._client.aclose()
@@ -0,0 +1,115 @@
+import threading, queue, time, logging, datetime
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class WriteBehindLogger:
+    """
+    Write-behind persistence for ConversationLog rows.
+    - log() enqueues a row and returns; a background thread inserts rows in bulk,
+      one transaction per batch_size rows or flush_interval seconds.
+    - When the queue is full, log() blocks for up to put_timeout seconds
+      (backpressure) and then writes the row synchronously rather than dropping it.
+    - close() stops the thread after flushing everything still queued.
+    """
+    def __init__(self, session_factory: Callable, model, max_queue: int = 10000, batch_size: int = 200,
+                 flush_interval: float = 0.5, put_timeout: float = 1.0):
+        self.session_factory = session_factory
+        self.model = model
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._written = 0
+        self._batches = 0
+        self._sync_writes = 0
+        self._failed = 0
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+            self._thread.start()
+        return self
+
+    def log(self, **row):
+        row.setdefault('timestamp', datetime.datetime.utcnow())
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self._sync_writes += 1
+            self._insert([row])
+
+    def flush(self):
+        """Block until every row queued so far has been written."""
+        self._queue.join()
+
+    def close(self, timeout: float = 10.0):
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        try:
+            with self.session_factory() as db:
+                db.bulk_insert_mappings(self.model, rows)
+                db.commit()
+            with self._lock:
+                self._written += len(rows)
+                self._batches += 1
+        except Exception:
+            with self._lock:
+                self._failed += len(rows)
+            logger.exception('Failed to write %d conversation log rows', len(rows))
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    row = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is _STOP:
+                    self._queue.task_done()
+                    stop = True
+                    break
+                batch.append(row)
+            self._insert(batch)
+            for _ in batch:
+                self._queue.task_done()
+        # Drain anything that raced in behind the stop marker.
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        rows = [r for r in leftover if r is not _STOP]
+        if rows:
+            self._insert(rows)
+        for _ in leftover:
+            self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'written': self._written,
+                'batches': self._batches,
+                'sync_writes': self._sync_writes,
+                'failed': self._failed,
+            }
@@ -0,0 +1,118 @@
+import time, threading, contextvars
+from contextlib import nullcontext
+from typing import Dict, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-request stage durations for the Server-Timing header (set by the middleware only)
+request_timings: contextvars.ContextVar = contextvars.ContextVar('request_timings', default=None)
+
+_NULL = nullcontext()
+
+def _labels_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted(labels.items()))
+
+def _render_labels(key: Tuple, extra: Tuple = ()) -> str:
+    items = key + extra
+    if not items:
+        return ''
+    escape = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in items) + '}'
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class _StageTimer:
+    __slots__ = ('metrics', 'stage', 'started')
+
+    def __init__(self, metrics: 'Metrics', stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        if self.metrics.enabled:
+            self.metrics.observe('chat_stage_seconds', elapsed, stage=self.stage)
+        timings = request_timings.get()
+        if timings is not None:
+            timings[self.stage] = timings.get(self.stage, 0.0) + elapsed
+        return False
+
+class Metrics:
+    """
+    Minimal in-process Prometheus registry (counters and histograms) rendered in
+    the text exposition format. When disabled, stage() hands back a shared
+    no-op context manager and inc()/observe() return immediately.
+    """
+    def __init__(self, enabled: bool = True, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, list]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str):
+        self._help[name] = ('counter', help)
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help: str):
+        self._help[name] = ('histogram', help)
+        self._histograms.setdefault(name, {})
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        if not self.enabled:
+            return
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def stage(self, stage: str):
+        """Context manager timing one stage of the chat pipeline."""
+        if not self.enabled and request_timings.get() is None:
+            return _NULL
+        return _StageTimer(self, stage)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in self._counters.items():
+                kind, help = self._help.get(name, ('counter', ''))
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} counter')
+                for key, value in series.items():
+                    lines.append(f'{name}{_render_labels(key)} {_fmt(value)}')
+            for name, series in self._histograms.items():
+                kind, help = self._help.get(name, ('histogram', ''))
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} histogram')
+                for key, (counts, total, count) in series.items():
+                    for bound, c in zip(self.buckets, counts):
+                        lines.append(f'{name}_bucket{_render_labels(key, (("le", _fmt(bound)),))} {c}')
+                    lines.append(f'{name}_bucket{_render_labels(key, (("le", "+Inf"),))} {count}')
+                    lines.append(f'{name}_sum{_render_labels(key)} {_fmt(total)}')
+                    lines.append(f'{name}_count{_render_labels(key)} {count}')
+        return '\n'.join(lines) + '\n'
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ', '.join(f'{stage};dur={seconds * 1000.0:.3f}' for stage, seconds in timings.items())
@@ -0,0 +1,100 @@
+import os, hashlib, threading, logging
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(ROOT_DIR, 'models')
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+# Files whose replacement means a new model version
+WATCHED_FILES = (
+    os.path.join(MODEL_DIR, 'intent_clf.joblib'),
+    os.path.join(DATA_DIR, 'faq.csv'),
+    os.path.join(MODEL_DIR, 'zero_shot_onnx', 'onnx_config.json'),
+)
+
+class ModelBundle:
+    """
+    One consistent set of NLU artifacts. Requests grab the current bundle once
+    and use it throughout, so a reload never mixes versions mid-request.
+    """
+    __slots__ = ('version', 'nlp', 'faq')
+
+    def __init__(self, version: str, nlp, faq):
+        self.version = version
+        self.nlp = nlp
+        self.faq = faq
+
+    def warm_up(self):
+        self.nlp.classify_intent('hello')
+        self.faq.search('where is my order')
+
+    def close(self):
+        self.nlp.close()
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    except OSError:
+        return 'none'
+    return h.hexdigest()[:8]
+
+def _zero_shot_version(nlp) -> str:
+    """Active zero-shot backend; an ONNX export also carries the digest of its model file."""
+    backend = nlp.zero_shot_backend or 'off'
+    if backend == 'onnx':
+        return f'onnx-{_file_digest(nlp.zero_shot.model_path)}'
+    return backend
+
+def load_bundle() -> ModelBundle:
+    from nlp.advanced_nlp import AdvancedNLP
+    from nlp.faq import FAQRetriever
+    clf_version = _file_digest(os.path.join(MODEL_DIR, 'intent_clf.joblib'))
+    faq = FAQRetriever()
+    faq_version = (faq.index.header.get('source_checksum') or 'mem')[:8] if faq.index is not None else 'none'
+    nlp = AdvancedNLP()
+    return ModelBundle(f'clf-{clf_version}.faq-{faq_version}.zs-{_zero_shot_version(nlp)}', nlp, faq)
+
+def files_fingerprint(paths=WATCHED_FILES) -> Tuple:
+    fp = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            fp.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            fp.append((path, None, None))
+    return tuple(fp)
+
+class ArtifactWatcher:
+    """Polls the watched artifact files and calls on_change() when any of them is replaced."""
+    def __init__(self, on_change: Callable[[], None], interval: float = 10.0, paths=WATCHED_FILES):
+        self.on_change = on_change
+        self.interval = interval
+        self.paths = paths
+        self._fingerprint = files_fingerprint(paths)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='artifact-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            fingerprint = files_fingerprint(self.paths)
+            if fingerprint == self._fingerprint:
+                continue
+            self._fingerprint = fingerprint
+            try:
+                self.on_change()
+            except Exception:
+                logger.exception('Model reload after artifact change failed')
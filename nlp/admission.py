@@ -0,0 +1,164 @@
+import time, asyncio, threading, contextvars
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+
+# Absolute time.monotonic() deadline of the current request (set by the app; copied into threadpool calls)
+request_deadline: contextvars.ContextVar = contextvars.ContextVar('request_deadline', default=None)
+
+class _GateStats:
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait_ms: float):
+        self.name = name
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_queue = max(0, int(max_queue))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _wait_budget(self) -> Optional[float]:
+        """Seconds a request may queue: max_wait capped by what is left of its deadline (None = past it)."""
+        deadline = request_deadline.get()
+        if deadline is None:
+            return self.max_wait
+        remaining = deadline - time.monotonic()
+        return min(self.max_wait, remaining) if remaining > 0 else None
+
+    def _admit(self, waited: float) -> bool:
+        self.admitted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        return True
+
+    def _reject(self, reason: str) -> bool:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return False
+
+    def _stats(self, queued: int) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'in_flight': self.in_flight,
+            'queued': queued,
+            'admitted': self.admitted,
+            'rejected': dict(self.rejected),
+            'avg_wait_ms': 1000.0 * self.wait_total / self.admitted if self.admitted else 0.0,
+            'max_wait_ms_seen': self.wait_max * 1000.0,
+        }
+
+class AdmissionGate(_GateStats):
+    """
+    Admission control for an expensive stage called from worker threads.
+    - At most max_concurrent callers run the stage at once; up to max_queue more
+      wait, each for at most max_wait_ms (less if the request deadline is closer).
+    - A caller that finds the queue full or runs out of time is rejected
+      immediately, so it can degrade to a cheaper path instead of piling up.
+    Rejections are counted by reason: queue_full, timeout, deadline.
+    """
+    def __init__(self, name: str, max_concurrent: int, max_queue: int = 16, max_wait_ms: float = 50.0):
+        super().__init__(name, max_concurrent, max_queue, max_wait_ms)
+        self._cond = threading.Condition()
+        self._queued = 0
+
+    def acquire(self) -> bool:
+        with self._cond:
+            budget = self._wait_budget()
+            if budget is None:
+                return self._reject('deadline')
+            if self.in_flight < self.max_concurrent and not self._queued:
+                self.in_flight += 1
+                return self._admit(0.0)
+            if self._queued >= self.max_queue:
+                return self._reject('queue_full')
+            started = time.monotonic()
+            end = started + budget
+            self._queued += 1
+            try:
+                while self.in_flight >= self.max_concurrent:
+                    remaining = end - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining) and self.in_flight >= self.max_concurrent:
+                        return self._reject('timeout')
+            finally:
+                self._queued -= 1
+            self.in_flight += 1
+            return self._admit(time.monotonic() - started)
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        """Yields True (and holds a slot for the block) if admitted, else False."""
+        admitted = self.acquire()
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return self._stats(self._queued)
+
+class AsyncAdmissionGate(_GateStats):
+    """AdmissionGate for coroutines on one event loop: waiters park on futures instead of threads."""
+    def __init__(self, name: str, max_concurrent: int, max_queue: int = 64, max_wait_ms: float = 200.0):
+        super().__init__(name, max_concurrent, max_queue, max_wait_ms)
+        self._waiters: deque = deque()
+
+    async def acquire(self) -> bool:
+        budget = self._wait_budget()
+        if budget is None:
+            return self._reject('deadline')
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            return self._admit(0.0)
+        if len(self._waiters) >= self.max_queue:
+            return self._reject('queue_full')
+        started = time.monotonic()
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            # release() hands its slot straight to the first waiter (in_flight stays the same)
+            await asyncio.wait_for(asyncio.shield(fut), budget)
+        except asyncio.TimeoutError:
+            if not fut.done():
+                fut.cancel()
+                return self._reject('timeout')
+        except asyncio.CancelledError:
+            # The caller went away; pass on a slot that was handed over meanwhile
+            if fut.done() and not fut.cancelled():
+                self.release()
+            else:
+                fut.cancel()
+            raise
+        finally:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+        return self._admit(time.monotonic() - started)
+
+    def release(self):
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(True)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        admitted = await self.acquire()
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._stats(len(self._waiters))
@@ -1,87 +1,293 @@
-import os, joblib
+import os, re, joblib, threading, importlib.util
 from typing import Tuple, Dict, Any, List
+from nlp.admission import AdmissionGate
+from nlp.batching import MicroBatcher
+from nlp.matcher import KeywordMatcher
+from nlp.onnx_backend import ONNX_DIR, OnnxZeroShot, is_exported, onnxruntime_available
 
 MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
 
-# Try to import transformers zero-shot classifier
-_zero_shot_available = False
-try:
-    from transformers import pipeline
-    _zero_shot_available = True
-except Exception:
-    pipeline = None
+# Opt-in micro-batching of zero-shot requests coming from concurrent /chat calls
+ZERO_SHOT_BATCHING = os.environ.get('ZERO_SHOT_BATCHING', '0').lower() in ('1', 'true', 'yes')
+ZERO_SHOT_MAX_BATCH = int(os.environ.get('ZERO_SHOT_MAX_BATCH', '16'))
+ZERO_SHOT_MAX_WAIT_MS = float(os.environ.get('ZERO_SHOT_MAX_WAIT_MS', '5'))
+
+# Cascade mode: cheap tiers answer when their confidence clears the threshold
+INTENT_CASCADE = os.environ.get('INTENT_CASCADE', '0').lower() in ('1', 'true', 'yes')
+INTENT_CASCADE_THRESHOLD = float(os.environ.get('INTENT_CASCADE_THRESHOLD', '0.6'))
+
+# Zero-shot model and backend: 'onnx' runs the int8 export from `nlp/train.py --export-onnx`
+# through onnxruntime, 'torch' the transformers pipeline; 'auto' prefers onnx when exported
+ZERO_SHOT_MODEL = os.environ.get('ZERO_SHOT_MODEL', 'facebook/bart-large-mnli')
+ZERO_SHOT_BACKEND = os.environ.get('ZERO_SHOT_BACKEND', 'auto').lower()
+ZERO_SHOT_ONNX_DIR = os.environ.get('ZERO_SHOT_ONNX_DIR', ONNX_DIR)
+
+# Admission control for zero-shot (opt-in): concurrent calls, callers allowed to queue and how long they
+# may wait; rejected messages degrade to the sklearn/keyword tiers. ZERO_SHOT_MAX_CONCURRENT=0 (default)
+# disables it. The wait should be a few times the measured zero-shot latency, which on CPU is far above
+# the LLM's queue budget. With batching the gate admits messages, not forward passes, so it is sized to
+# max_concurrent full batches.
+ZERO_SHOT_MAX_CONCURRENT = int(os.environ.get('ZERO_SHOT_MAX_CONCURRENT', '0'))
+ZERO_SHOT_MAX_QUEUE = int(os.environ.get('ZERO_SHOT_MAX_QUEUE', '16'))
+ZERO_SHOT_MAX_QUEUE_WAIT_MS = float(os.environ.get('ZERO_SHOT_MAX_QUEUE_WAIT_MS', '1000'))
+
+KEYWORDS = {
+    'track_order': ['track','where is my order','order status','where is my package'],
+    'refund_status': ['refund','refunded','refund status'],
+    'greet': ['hi','hello','hey'],
+    'goodbye': ['bye','goodbye'],
+    'escalate': ['human','representative','agent','escalate']
+}
+# Keywords start on a word boundary; short ones ('hi', 'hey') must also end on one so they do not
+# fire inside 'this' or 'they', longer ones also match inflections ('tracking', 'refunds')
+_KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
+_WORD_RE = re.compile(r'\w+')
+
+# In cascade mode a keyword is strong evidence only as a full phrase: a multi-word keyword, or a
+# message that is nothing but the keyword. A single word inside a longer message stays below the
+# cascade threshold, so it still goes to zero-shot. Without the cascade every hit keeps 0.6.
+KEYWORD_PHRASE_CONF = 0.6
+KEYWORD_WORD_CONF = 0.5
+
+def _keyword_confidence(low: str, keyword: str) -> float:
+    if ' ' in keyword or ' '.join(_WORD_RE.findall(low)) == keyword:
+        return KEYWORD_PHRASE_CONF
+    return KEYWORD_WORD_CONF
+
+# transformers is only imported when the zero-shot classifier is actually built
+_zero_shot_available = importlib.util.find_spec('transformers') is not None
+
+# Returned by _classify_zero_shot when admission control turned the message away
+_SHED = object()
 
 class AdvancedNLP:
     """
-    - Uses transformers zero-shot classification if installed (facebook/bart-large-mnli).
+    - Uses transformers zero-shot classification if installed (facebook/bart-large-mnli),
+      through the quantized ONNX export on onnxruntime when one exists, else PyTorch.
     - Falls back to the existing sklearn pipeline (intent_clf.joblib) if available.
     - Falls back to simple keyword heuristics if nothing else available.
+    - With batching enabled, concurrent zero-shot calls are coalesced by a
+      MicroBatcher into a single batched forward pass.
+    - In cascade mode the order is reversed: the sklearn margin or a keyword hit
+      answers directly when it clears cascade_threshold, and only ambiguous
+      messages escalate to zero-shot. Per-tier hit counts are in tier_stats().
+    - Zero-shot calls pass an AdmissionGate; when it is saturated the message is
+      answered by the cheaper tiers and its meta carries degraded=True.
     """
-    def __init__(self, intents_list: List[str] = None):
+    def __init__(self, intents_list: List[str] = None, batching: bool = None,
+                 max_batch_size: int = ZERO_SHOT_MAX_BATCH, max_wait_ms: float = ZERO_SHOT_MAX_WAIT_MS,
+                 cascade: bool = None, cascade_threshold: float = INTENT_CASCADE_THRESHOLD,
+                 zero_shot_backend: str = None, zero_shot_model: str = ZERO_SHOT_MODEL,
+                 onnx_dir: str = ZERO_SHOT_ONNX_DIR, max_concurrent: int = ZERO_SHOT_MAX_CONCURRENT):
         self.intent_list = intents_list or [
             'greet','goodbye','thanks','track_order','cancel_order','refund_status',
             'return_policy','shipping_info','payment_issue','product_info',
             'exchange_request','complaint','escalate'
         ]
+        self.cascade = INTENT_CASCADE if cascade is None else cascade
+        self.cascade_threshold = cascade_threshold
+        self._tier_counts: Dict[str, int] = {}
+        self._tier_lock = threading.Lock()
+
         self.zero_shot = None
-        if _zero_shot_available:
+        self.zero_shot_backend = None
+        backend = (zero_shot_backend or ZERO_SHOT_BACKEND).lower()
+        if _zero_shot_available and backend in ('auto', 'onnx') and onnxruntime_available and is_exported(onnx_dir):
+            try:
+                self.zero_shot = OnnxZeroShot(onnx_dir)
+                self.zero_shot_backend = 'onnx'
+            except Exception:
+                self.zero_shot = None
+        if _zero_shot_available and self.zero_shot is None:
             try:
-                self.zero_shot = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+                from transformers import pipeline
+                self.zero_shot = pipeline("zero-shot-classification", model=zero_shot_model)
+                self.zero_shot_backend = 'torch'
             except Exception:
                 self.zero_shot = None
 
+        self.batcher = None
+        if batching is None:
+            batching = ZERO_SHOT_BATCHING
+        if batching and self.zero_shot:
+            self.batcher = MicroBatcher(self._zero_shot_many, max_batch_size=max_batch_size,
+                                        max_wait_ms=max_wait_ms, name='zero-shot-batcher')
+
+        self.admission = None
+        if max_concurrent > 0 and self.zero_shot:
+            if self.batcher:
+                max_concurrent *= self.batcher.max_batch_size
+            self.admission = AdmissionGate('zero_shot', max_concurrent, max_queue=ZERO_SHOT_MAX_QUEUE,
+                                           max_wait_ms=ZERO_SHOT_MAX_QUEUE_WAIT_MS)
+
         self.fallback = None
         try:
             self.fallback = joblib.load(os.path.join(MODEL_DIR, 'intent_clf.joblib'))
         except Exception:
             self.fallback = None
 
+    def _zero_shot_many(self, texts: List[str]) -> List[Tuple[str, float, Dict[str, Any]]]:
+        # One pipeline call over all texts; every (text, label) pair is an NLI input.
+        batch_size = min(len(texts), ZERO_SHOT_MAX_BATCH) * len(self.intent_list)
+        out = self.zero_shot(texts, self.intent_list, batch_size=batch_size)
+        if isinstance(out, dict):
+            out = [out]
+        return [(res['labels'][0], float(res['scores'][0]), {'scores': dict(zip(res['labels'], res['scores']))})
+                for res in out]
+
+    def batch_stats(self) -> Dict[str, Any]:
+        return self.batcher.stats() if self.batcher else {}
+
+    def close(self):
+        if self.batcher:
+            self.batcher.close()
+
+    def _classify_linear_many(self, texts: List[str]) -> List[Any]:
+        if not self.fallback:
+            return [None] * len(texts)
+        try:
+            labels = self.fallback.predict(texts)
+        except Exception:
+            return [None] * len(texts)
+        confs = [0.6] * len(texts)
+        try:
+            # Last step is the classifier; the steps before it (TF-IDF or hashing) produce its features
+            clf = self.fallback.steps[-1][1]
+            if hasattr(clf, 'decision_function'):
+                import numpy as np
+                margins = clf.decision_function(self.fallback[:-1].transform(texts))
+                if hasattr(margins, 'ndim') and margins.ndim == 1:
+                    m = np.abs(margins)
+                else:
+                    m = np.abs(margins.max(axis=1))
+                confs = (1.0 - 1.0 / (1.0 + m)).tolist()
+        except Exception:
+            confs = [0.6] * len(texts)
+        return [(label, float(conf), {}) for label, conf in zip(labels, confs)]
+
+    def _classify_linear(self, text: str):
+        return self._classify_linear_many([text])[0]
+
+    def _classify_keywords(self, text: str):
+        label = _KEYWORD_MATCHER.best(text)
+        if not label:
+            return None
+        if not self.cascade:
+            return label, KEYWORD_PHRASE_CONF, {}
+        low = text.lower()
+        conf = max((_keyword_confidence(low, hit.text) for hit in _KEYWORD_MATCHER.hits(text) if hit.label == label),
+                   default=KEYWORD_WORD_CONF)
+        return label, conf, {}
+
+    def _run_zero_shot(self, text: str):
+        try:
+            if self.batcher:
+                return self.batcher.submit(text)
+            return self._zero_shot_many([text])[0]
+        except Exception:
+            return None
+
+    def classify_cheap(self, text: str):
+        """Best of the sklearn and keyword tiers (no zero-shot, not counted in tier_stats), or None."""
+        results = [r for r in (self._classify_linear(text.strip()), self._classify_keywords(text.strip())) if r]
+        return max(results, key=lambda r: r[1]) if results else None
+
+    def _classify_zero_shot(self, text: str):
+        if not self.zero_shot:
+            return None
+        if self.admission is None:
+            return self._run_zero_shot(text)
+        with self.admission.slot() as admitted:
+            return self._run_zero_shot(text) if admitted else _SHED
+
+    def _answer(self, tier: str, result, degraded: bool = False):
+        with self._tier_lock:
+            self._tier_counts[tier] = self._tier_counts.get(tier, 0) + 1
+            if degraded:
+                self._tier_counts['degraded'] = self._tier_counts.get('degraded', 0) + 1
+        label, conf, meta = result
+        meta = dict(meta, tier=tier)
+        if degraded:
+            meta['degraded'] = True
+        return label, conf, meta
+
+    def tier_stats(self) -> Dict[str, Any]:
+        with self._tier_lock:
+            return {'cascade': self.cascade, 'threshold': self.cascade_threshold,
+                    'zero_shot_backend': self.zero_shot_backend, 'hits': dict(self._tier_counts),
+                    'admission': self.admission.stats() if self.admission else {}}
+
     def classify_intent(self, text: str) -> Tuple[str, float, Dict[str, Any]]:
         text = text.strip()
+        if self.cascade:
+            return self._classify_cascade(text)
+
         # 1) Zero-shot if available
-        if self.zero_shot:
-            try:
-                res = self.zero_shot(text, self.intent_list)
-                label = res['labels'][0]
-                score = float(res['scores'][0])
-                return label, score, {'scores': dict(zip(res['labels'], res['scores']))}
-            except Exception:
-                pass
+        res = self._classify_zero_shot(text)
+        shed = res is _SHED
+        if res and not shed:
+            return self._answer('zero_shot', res)
 
         # 2) Fallback to sklearn pipeline
-        if self.fallback:
+        res = self._classify_linear(text)
+        if res:
+            return self._answer('linear', res, shed)
+
+        # 3) Keyword fallback
+        res = self._classify_keywords(text)
+        if res:
+            return self._answer('keyword', res, shed)
+        return self._answer('none', ('unknown', 0.0, {}), shed)
+
+    def _classify_cascade(self, text: str) -> Tuple[str, float, Dict[str, Any]]:
+        # Cheap tiers answer directly when confident; only ambiguous messages pay for zero-shot.
+        linear = self._classify_linear(text)
+        if linear and linear[1] >= self.cascade_threshold:
+            return self._answer('linear', linear)
+        keyword = self._classify_keywords(text)
+        if keyword and keyword[1] >= self.cascade_threshold:
+            return self._answer('keyword', keyword)
+
+        res = self._classify_zero_shot(text)
+        shed = res is _SHED
+        if res and not shed:
+            return self._answer('zero_shot', res)
+        if linear:
+            return self._answer('linear', linear, shed)
+        if keyword:
+            return self._answer('keyword', keyword, shed)
+        return self._answer('none', ('unknown', 0.0, {}), shed)
+
+    def classify_many(self, texts: List[str]) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Batch version of classify_intent: each tier runs once over all texts that reach it."""
+        texts = [t.strip() for t in texts]
+        out: List[Any] = [None] * len(texts)
+        linear = self._classify_linear_many(texts) if (self.cascade or not self.zero_shot) else [None] * len(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            if self.cascade:
+                if linear[i] and linear[i][1] >= self.cascade_threshold:
+                    out[i] = self._answer('linear', linear[i])
+                    continue
+                keyword = self._classify_keywords(text)
+                if keyword and keyword[1] >= self.cascade_threshold:
+                    out[i] = self._answer('keyword', keyword)
+                    continue
+            pending.append(i)
+
+        if pending and self.zero_shot:
             try:
-                label = self.fallback.predict([text])[0]
-                conf = 0.6
-                try:
-                    clf = self.fallback.named_steps.get('clf')
-                    vec = self.fallback.named_steps.get('tfidf')
-                    if clf is not None and vec is not None and hasattr(clf, 'decision_function'):
-                        Xv = vec.transform([text])
-                        margins = clf.decision_function(Xv)
-                        import numpy as np
-                        if hasattr(margins, 'ndim') and margins.ndim == 1:
-                            conf = float(abs(margins[0]))
-                        else:
-                            conf = float(abs(margins.max()))
-                        conf = 1.0 - 1.0 / (1.0 + conf)
-                except Exception:
-                    conf = 0.6
-                return label, conf, {}
+                for i, res in zip(pending, self._zero_shot_many([texts[i] for i in pending])):
+                    out[i] = self._answer('zero_shot', res)
+                pending = []
             except Exception:
-                pass
+                if not self.cascade:
+                    linear = self._classify_linear_many(texts)
 
-        # 3) Keyword fallback
-        low = text.lower()
-        keywords = {
-            'track_order': ['track','where is my order','order status','where is my package'],
-            'refund_status': ['refund','refunded','refund status'],
-            'greet': ['hi','hello','hey'],
-            'goodbye': ['bye','goodbye'],
-            'escalate': ['human','representative','agent','escalate']
-        }
-        for lab, kws in keywords.items():
-            for kw in kws:
-                if kw in low:
-                    return lab, 0.6, {}
-        return 'unknown', 0.0, {}
+        for i in pending:
+            if linear[i]:
+                out[i] = self._answer('linear', linear[i])
+                continue
+            keyword = self._classify_keywords(texts[i])
+            out[i] = self._answer('keyword', keyword) if keyword else self._answer('none', ('unknown', 0.0, {}))
+        return out
@@ -0,0 +1,114 @@
+import threading, queue, time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+_STOP = object()
+
+class MicroBatcher:
+    """
+    Coalesces items submitted from concurrent threads into batches.
+    - A batch is dispatched when it reaches max_batch_size, or max_wait_ms after
+      its first item was queued, whichever comes first.
+    - fn receives a list of items and must return a list of results in the same order.
+    - submit() blocks the calling thread until its own result is available.
+    """
+    def __init__(self, fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 16,
+                 max_wait_ms: float = 5.0, max_queue: int = 1024, name: str = 'micro-batcher'):
+        self.fn = fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._max_batch = 0
+        self._size_counts: Dict[int, int] = {}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._closed = False
+        # Guards _closed together with the put, so nothing is queued behind _STOP
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        fut = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError('MicroBatcher is closed')
+            self._queue.put((item, fut, time.perf_counter()))
+        return fut.result(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = first[2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+            self._dispatch(batch)
+        self._fail_pending()
+
+    def _fail_pending(self):
+        # Whatever is still queued once the worker stops would otherwise block its caller forever
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not _STOP:
+                entry[1].set_exception(RuntimeError('closed'))
+
+    def _dispatch(self, batch):
+        started = time.perf_counter()
+        waits = [started - queued_at for _, _, queued_at in batch]
+        try:
+            results = self.fn([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f'batch fn returned {len(results)} results for {len(batch)} items')
+        except Exception as e:
+            for _, fut, _ in batch:
+                fut.set_exception(e)
+        else:
+            for (_, fut, _), res in zip(batch, results):
+                fut.set_result(res)
+        with self._lock:
+            n = len(batch)
+            self._batches += 1
+            self._items += n
+            self._max_batch = max(self._max_batch, n)
+            self._size_counts[n] = self._size_counts.get(n, 0) + 1
+            self._wait_total += sum(waits)
+            self._wait_max = max(self._wait_max, max(waits))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'batches': self._batches,
+                'items': self._items,
+                'mean_batch_size': (self._items / self._batches) if self._batches else 0.0,
+                'max_batch_size': self._max_batch,
+                'batch_size_counts': dict(sorted(self._size_counts.items())),
+                'mean_queue_wait_ms': (1000.0 * self._wait_total / self._items) if self._items else 0.0,
+                'max_queue_wait_ms': 1000.0 * self._wait_max,
+                'queue_depth': self._queue.qsize(),
+            }
@@ -1,31 +1,58 @@
-import os, joblib, pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+import numpy as np
+from typing import List, Optional, Tuple
+from sklearn.preprocessing import normalize
+from nlp.faq_index import INDEX_DIR, FAQIndex, load_index
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
-MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+
+def _top_k(scores: np.ndarray, idx: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the k best (score, index) pairs of a sparse row, best first."""
+    if scores.size > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        scores, idx = scores[part], idx[part]
+    order = np.argsort(-scores, kind='stable')
+    return scores[order], idx[order]
 
 class FAQRetriever:
-    def __init__(self, threshold: float = 0.35):
-        self.df = None
-        self.vectorizer = None
-        faq_path = os.path.join(DATA_DIR, 'faq.csv')
-        if os.path.exists(faq_path):
-            self.df = pd.read_csv(faq_path)
-            vect_path = os.path.join(MODEL_DIR, 'faq_vectorizer.joblib')
-            if os.path.exists(vect_path):
-                self.vectorizer = joblib.load(vect_path)
-            else:
-                from sklearn.feature_extraction.text import TfidfVectorizer
-                self.vectorizer = TfidfVectorizer().fit(self.df['question'].astype(str).tolist())
+    """
+    TF-IDF FAQ retriever.
+    - Opens the memory-mapped index written by nlp/train.py (rebuilt from data/faq.csv if stale).
+    - The question matrix is L2-normalized up front, so cosine similarity is a
+      single sparse dot product per query.
+    """
+    def __init__(self, threshold: float = 0.35, index_dir: str = INDEX_DIR, index: Optional[FAQIndex] = None):
+        self.index = index if index is not None else load_index(index_dir, os.path.join(DATA_DIR, 'faq.csv'))
         self.threshold = threshold
 
-    def search(self, query: str):
-        if self.df is None or self.vectorizer is None or len(self.df)==0:
+    @property
+    def vectorizer(self):
+        return self.index.vectorizer if self.index is not None else None
+
+    def __len__(self):
+        return 0 if self.index is None else len(self.index)
+
+    def _similarities(self, queries: List[str]):
+        q = normalize(self.index.vectorizer.transform(queries), norm='l2', copy=False)
+        return (q @ self.index.matrix_t).tocsr()
+
+    def search_many(self, queries: List[str], k: int = 5) -> List[List[Tuple[str, float]]]:
+        """Rank the top-k answers for each query; returns one [(answer, score), ...] list per query."""
+        if len(self) == 0 or not queries:
+            return [[] for _ in queries]
+        sims = self._similarities(list(queries))
+        results = []
+        for i in range(sims.shape[0]):
+            start, end = sims.indptr[i], sims.indptr[i + 1]
+            scores, idx = _top_k(sims.data[start:end], sims.indices[start:end], k)
+            results.append([(self.index.answer(j), float(s)) for j, s in zip(idx, scores)])
+        return results
+
+    def search(self, query: str) -> Tuple[Optional[str], float]:
+        ranked = self.search_many([query], k=1)[0]
+        if not ranked:
             return None, 0.0
-        q_vec = self.vectorizer.transform([query])
-        mtx = self.vectorizer.transform(self.df['question'].astype(str).tolist())
-        sims = cosine_similarity(q_vec, mtx)[0]
-        if sims.max() >= self.threshold:
-            idx = sims.argmax()
-            return self.df.iloc[idx]['answer'], float(sims[idx])
-        return None, float(sims.max()) if len(sims)>0 else 0.0
+        answer, score = ranked[0]
+        if score >= self.threshold:
+            return answer, score
+        return None, score
@@ -0,0 +1,239 @@
+"""
+Persisted FAQ index shared zero-copy by every worker process.
+
+An index lives in its own directory, named after the format version and the
+checksum of the FAQ source it was built from:
+
+    header.json         format version, source checksum, shapes, vectorizer params
+    vocab.json          term -> column mapping of the query vectorizer
+    idf.npy             idf weights (when the vectorizer uses idf)
+    data.npy, indices.npy, indptr.npy
+                        CSR components of the L2-normalized question matrix,
+                        stored transposed (vocab x n_questions)
+    answers.bin         UTF-8 answers, concatenated
+    answer_offsets.npy  int64 byte offsets into answers.bin (n_questions + 1)
+
+Arrays are opened with numpy.memmap, so workers share the pages through the
+OS page cache instead of each holding a DataFrame and a vectorizer.
+"""
+import os, csv, json, hashlib, shutil, tempfile
+import numpy as np
+from contextlib import contextmanager
+from typing import List, Optional, Sequence, Tuple
+from scipy.sparse import csr_matrix
+from sklearn.preprocessing import normalize
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+INDEX_DIR = os.path.join(MODEL_DIR, 'faq_index')
+
+FORMAT_VERSION = 1
+
+try:
+    import fcntl
+except ImportError:  # Windows: publishing is not serialized across processes
+    fcntl = None
+
+# Vectorizer settings that affect transform(); everything else is fit-time only.
+_VECTORIZER_PARAMS = (
+    'lowercase', 'strip_accents', 'stop_words', 'token_pattern', 'ngram_range',
+    'analyzer', 'binary', 'norm', 'use_idf', 'smooth_idf', 'sublinear_tf',
+)
+
+def make_vectorizer():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(ngram_range=(1,2), min_df=1)
+
+def file_checksum(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def index_path(index_root: str, checksum: str) -> str:
+    return os.path.join(index_root, f'v{FORMAT_VERSION}-{checksum[:16]}')
+
+def read_faq_csv(path: str) -> Tuple[List[str], List[str]]:
+    questions, answers = [], []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            questions.append(str(row.get('question') or ''))
+            answers.append(str(row.get('answer') or ''))
+    return questions, answers
+
+class FAQIndex:
+    """Query vectorizer, transposed question matrix and answer store."""
+    def __init__(self, vectorizer, matrix_t, answers, offsets=None, header=None):
+        self.vectorizer = vectorizer
+        self.matrix_t = matrix_t
+        self._answers = answers
+        self._offsets = offsets
+        self.header = header or {}
+
+    @classmethod
+    def from_texts(cls, questions: Sequence[str], answers: Sequence[str], vectorizer):
+        mtx = normalize(vectorizer.transform(list(questions)), norm='l2', copy=False)
+        return cls(vectorizer, mtx.T.tocsr(), np.asarray(list(answers), dtype=object))
+
+    def __len__(self):
+        return self.matrix_t.shape[1]
+
+    def answer(self, i: int) -> str:
+        if self._offsets is None:
+            return self._answers[i]
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._answers[start:end].tobytes().decode('utf-8')
+
+def _vectorizer_params(vectorizer) -> dict:
+    params = {}
+    for name in _VECTORIZER_PARAMS:
+        value = getattr(vectorizer, name, None)
+        if isinstance(value, (set, frozenset, tuple)):
+            value = sorted(value) if isinstance(value, (set, frozenset)) else list(value)
+        params[name] = value
+    return params
+
+def _restore_vectorizer(params: dict, vocab: dict, idf):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    params = dict(params)
+    params['ngram_range'] = tuple(params['ngram_range'])
+    vectorizer = TfidfVectorizer(vocabulary=vocab, **params)
+    if params.get('use_idf') and idf is not None:
+        vectorizer.idf_ = np.asarray(idf)
+    return vectorizer
+
+def write_index(index_root: str, checksum: str, questions: Sequence[str], answers: Sequence[str],
+                vectorizer, replace: bool = False) -> str:
+    """
+    Write an index atomically; header.json is written last and the directory renamed into place.
+    Without replace, a valid index already published for this checksum is kept as is.
+    """
+    final = index_path(index_root, checksum)
+    if not replace and open_index(final, checksum) is not None:
+        return final
+    mtx = normalize(vectorizer.transform(list(questions)), norm='l2', copy=False).T.tocsr()
+    encoded = [a.encode('utf-8') for a in answers]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+
+    os.makedirs(index_root, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix='.tmp-', dir=index_root)
+    try:
+        np.save(os.path.join(tmp, 'data.npy'), mtx.data.astype(np.float32))
+        np.save(os.path.join(tmp, 'indices.npy'), mtx.indices)
+        np.save(os.path.join(tmp, 'indptr.npy'), mtx.indptr)
+        np.save(os.path.join(tmp, 'answer_offsets.npy'), offsets)
+        with open(os.path.join(tmp, 'answers.bin'), 'wb') as f:
+            f.write(b''.join(encoded))
+        with open(os.path.join(tmp, 'vocab.json'), 'w') as f:
+            json.dump({t: int(i) for t, i in vectorizer.vocabulary_.items()}, f)
+        if getattr(vectorizer, 'use_idf', False):
+            np.save(os.path.join(tmp, 'idf.npy'), vectorizer.idf_)
+        header = {
+            'format_version': FORMAT_VERSION,
+            'source_checksum': checksum,
+            'n_questions': len(encoded),
+            'vocab_size': mtx.shape[0],
+            'nnz': int(mtx.nnz),
+            'vectorizer': _vectorizer_params(vectorizer),
+        }
+        with open(os.path.join(tmp, 'header.json'), 'w') as f:
+            json.dump(header, f)
+        with _publish_lock(index_root):
+            if not replace and open_index(final, checksum) is not None:
+                # Another worker published the same index while this one was building.
+                shutil.rmtree(tmp, ignore_errors=True)
+                return final
+            if os.path.exists(final):
+                stale = tempfile.mkdtemp(prefix='.stale-', dir=index_root)
+                os.rename(final, os.path.join(stale, 'index'))
+                shutil.rmtree(stale, ignore_errors=True)
+            os.rename(tmp, final)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return final
+
+@contextmanager
+def _publish_lock(index_root: str):
+    """Serialize swapping index directories into place across processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(index_root, '.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def open_index(path: str, checksum: Optional[str] = None) -> Optional[FAQIndex]:
+    """Memory-map an index; returns None if it is missing, incomplete or stale."""
+    try:
+        with open(os.path.join(path, 'header.json')) as f:
+            header = json.load(f)
+        if header.get('format_version') != FORMAT_VERSION:
+            return None
+        if checksum is not None and header.get('source_checksum') != checksum:
+            return None
+        load = lambda name: np.load(os.path.join(path, name), mmap_mode='r')
+        data, indices, indptr = load('data.npy'), load('indices.npy'), load('indptr.npy')
+        offsets = load('answer_offsets.npy')
+        n, vocab_size = header['n_questions'], header['vocab_size']
+        if len(indptr) != vocab_size + 1 or len(data) != header['nnz'] or len(offsets) != n + 1:
+            return None
+        if int(offsets[-1]) > 0:
+            answers = np.memmap(os.path.join(path, 'answers.bin'), dtype=np.uint8, mode='r')
+        else:
+            answers = np.zeros(0, dtype=np.uint8)
+        if len(answers) != int(offsets[-1]):
+            return None
+        with open(os.path.join(path, 'vocab.json')) as f:
+            vocab = json.load(f)
+        idf_path = os.path.join(path, 'idf.npy')
+        idf = np.load(idf_path) if os.path.exists(idf_path) else None
+        vectorizer = _restore_vectorizer(header['vectorizer'], vocab, idf)
+        matrix_t = csr_matrix((data, indices, indptr), shape=(vocab_size, n), copy=False)
+        return FAQIndex(vectorizer, matrix_t, answers, offsets, header)
+    except (OSError, ValueError, KeyError):
+        return None
+
+def build_index(source_path: str, index_root: str = INDEX_DIR, vectorizer=None, replace: bool = False) -> str:
+    questions, answers = read_faq_csv(source_path)
+    if vectorizer is None:
+        vectorizer = make_vectorizer().fit(questions)
+    return write_index(index_root, file_checksum(source_path), questions, answers, vectorizer, replace=replace)
+
+def load_index(index_root: str = INDEX_DIR, source_path: Optional[str] = None) -> Optional[FAQIndex]:
+    """
+    Open the index matching source_path, rebuilding it if it is missing or stale.
+    Without a source file, the newest index of the current format version is used.
+    """
+    if source_path and os.path.exists(source_path):
+        checksum = file_checksum(source_path)
+        index = open_index(index_path(index_root, checksum), checksum)
+        if index is None:
+            questions, _ = read_faq_csv(source_path)
+            if not questions:
+                return None
+            # Only replaces a missing or broken index; a worker that loses the race reopens the winner's.
+            index = open_index(build_index(source_path, index_root), checksum)
+        return index
+    if not os.path.isdir(index_root):
+        return None
+    prefix = f'v{FORMAT_VERSION}-'
+    candidates = [os.path.join(index_root, d) for d in os.listdir(index_root) if d.startswith(prefix)]
+    for path in sorted(candidates, key=os.path.getmtime, reverse=True):
+        index = open_index(path)
+        if index is not None:
+            return index
+    return None
+
+def prune_indexes(index_root: str, keep: str):
+    """Remove every index directory except `keep` (workers holding old mappings keep them alive)."""
+    if not os.path.isdir(index_root):
+        return
+    for d in os.listdir(index_root):
+        path = os.path.join(index_root, d)
+        if os.path.isdir(path) and os.path.abspath(path) != os.path.abspath(keep):
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,149 @@
+import re, json
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+class Span(NamedTuple):
+    label: str
+    start: int
+    end: int
+    text: str
+
+def trie_regex(literals: Iterable[str]) -> str:
+    """
+    Regex source matching any of the literals, laid out as a prefix tree so the
+    engine follows one branch per character instead of trying every literal in
+    turn. Optional tails are greedy, so the longest literal at a position wins.
+    """
+    trie: Dict[str, dict] = {}
+    for lit in literals:
+        if not lit:
+            continue
+        node = trie
+        for ch in lit:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node: dict) -> str:
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ''
+        body = alts[0] if len(alts) == 1 else '(?:' + '|'.join(alts) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return emit(trie)
+
+class PatternMatcher:
+    """
+    Several labelled regexes compiled into one alternation with a named group
+    per pattern, so a single finditer() pass finds every span. Where two
+    patterns match at the same position the one defined first wins.
+    """
+    def __init__(self, patterns: Sequence[Tuple[str, str]], flags: int = 0):
+        self.labels = list(dict.fromkeys(label for label, _ in patterns))
+        self._group_labels = {f'p{i}': label for i, (label, _) in enumerate(patterns)}
+        source = '|'.join(f'(?P<p{i}>{pattern})' for i, (_, pattern) in enumerate(patterns))
+        self._re = re.compile(source, flags) if patterns else None
+
+    @classmethod
+    def from_definitions(cls, definitions: Iterable[dict]) -> 'PatternMatcher':
+        """Definitions are {"name", "pattern"} or {"name", "literals", "ignore_case"} dicts."""
+        patterns = []
+        for d in definitions:
+            if 'pattern' in d:
+                pattern = d['pattern']
+            else:
+                pattern = r'\b' + trie_regex(d['literals']) + r'\b'
+            if d.get('ignore_case'):
+                pattern = f'(?i:{pattern})'
+            patterns.append((d['name'], pattern))
+        return cls(patterns)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'PatternMatcher':
+        with open(path, encoding='utf-8') as f:
+            return cls.from_definitions(json.load(f).get('entities', []))
+
+    def finditer(self, text: str) -> Iterator[Span]:
+        if self._re is None:
+            return
+        for m in self._re.finditer(text):
+            yield Span(self._group_labels[m.lastgroup], m.start(), m.end(), m.group())
+
+    def find_all(self, text: str) -> List[Span]:
+        return list(self.finditer(text))
+
+    def first(self, text: str) -> Dict[str, str]:
+        """Text of the first span found for each label."""
+        found: Dict[str, str] = {}
+        if self._re is not None:
+            for m in self._re.finditer(text):
+                label = self._group_labels[m.lastgroup]
+                if label not in found:
+                    found[label] = m.group()
+        return found
+
+    def mask(self, text: str, fmt: str = ' <{label}> ') -> str:
+        if self._re is None:
+            return text
+        return self._re.sub(lambda m: fmt.format(label=self._group_labels[m.lastgroup]), text)
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+# Keywords at least this long also match inflected forms ('track' -> 'tracking', 'refund' -> 'refunds');
+# shorter ones are ambiguous inside other words ('hi' in 'this') and must match as whole words.
+STEM_MIN_LEN = 4
+
+def keyword_pattern(keyword: str, stem_min_len: int = STEM_MIN_LEN) -> str:
+    """Regex source for one keyword with KeywordMatcher's semantics (lowercase text)."""
+    return r'\b' + re.escape(keyword) + (r'\w*' if len(keyword) >= stem_min_len else r'\b')
+
+class KeywordMatcher:
+    """
+    Case-insensitive lookup of labelled keyword lists in one pass. Keywords
+    start on a word boundary; short ones must end on one too, longer ones may
+    carry a word suffix (see keyword_pattern). Labels are ranked by their order
+    in the mapping; best() returns the highest-ranked label with any keyword in
+    the text, the same answer as searching for every keyword_pattern in turn.
+    """
+    def __init__(self, keywords: Dict[str, Iterable[str]], stem_min_len: int = STEM_MIN_LEN):
+        self.labels = list(keywords)
+        owners: Dict[str, int] = {}
+        for rank, kws in enumerate(keywords.values()):
+            for kw in kws:
+                kw = kw.lower()
+                if kw and kw not in owners:
+                    owners[kw] = rank
+        # Only the longest keyword is reported at each position, so a hit also stands for every
+        # keyword that is a prefix of it and would match there on its own: a stem, or a prefix
+        # ending on a word boundary.
+        self._rank = {kw: min([r] + [owners[kw[:i]] for i in range(1, len(kw)) if kw[:i] in owners and
+                                     (i >= stem_min_len or _is_word(kw[i - 1]) != _is_word(kw[i]))])
+                      for kw, r in owners.items()}
+        self._owner = owners
+        stems = [kw for kw in owners if len(kw) >= stem_min_len]
+        words = [kw for kw in owners if len(kw) < stem_min_len]
+        alts = ([rf'({trie_regex(stems)})(\w*)'] if stems else []) + ([rf'({trie_regex(words)})\b()'] if words else [])
+        self._re = re.compile(r'(?=\b(?:' + '|'.join(alts) + '))') if owners else None
+
+    def _matches(self, text: str) -> Iterator[Tuple[int, str, str]]:
+        """(start, keyword, suffix) for the longest keyword at each position."""
+        if self._re is None:
+            return
+        for m in self._re.finditer(text.lower()):
+            groups = [g for g in m.groups() if g is not None]
+            yield m.start(), groups[0], groups[1]
+
+    def hits(self, text: str) -> List[Span]:
+        """Spans cover the matched word, suffix included; text is the lowercased match."""
+        return [Span(self.labels[self._owner[kw]], start, start + len(kw) + len(suffix), kw + suffix)
+                for start, kw, suffix in self._matches(text)]
+
+    def best(self, text: str) -> Optional[str]:
+        best = None
+        for _, kw, _ in self._matches(text):
+            rank = self._rank[kw]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return None if best is None else self.labels[best]
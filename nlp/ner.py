@@ -1,18 +1,25 @@
-import re
+import os, re
+from typing import Dict, List
+from nlp.matcher import PatternMatcher, Span
 
-ORDER_ID_RE = re.compile(r'\b\d{3}-\d{7,8}-\d{7,8}\b')  # e.g., 123-4567890-1234567
-EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}')
-PHONE_RE = re.compile(r'\b\+?\d[\d\s\-]{7,}\b')
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 
-def extract_entities(text: str):
-    entities = {}
-    order_ids = ORDER_ID_RE.findall(text)
-    if order_ids:
-        entities['order_id'] = order_ids[0]
-    email = EMAIL_RE.findall(text)
-    if email:
-        entities['email'] = email[0]
-    phone = PHONE_RE.findall(text)
-    if phone:
-        entities['phone'] = phone[0]
-    return entities
+# Entity types are data: add a {"name", "pattern"} (or {"name", "literals"}) entry to the file
+ENTITY_DEFS = os.environ.get('ENTITY_DEFS', os.path.join(DATA_DIR, 'entities.json'))
+ENTITY_MATCHER = PatternMatcher.from_file(ENTITY_DEFS)
+_WORD_RE = re.compile(r'\w+')
+
+def find_entities(text: str) -> List[Span]:
+    """Every entity span in the text, in order, found in one pass."""
+    return ENTITY_MATCHER.find_all(text)
+
+def extract_entities(text: str) -> Dict[str, str]:
+    return ENTITY_MATCHER.first(text)
+
+def residual_text(text: str) -> str:
+    """The text with every entity span removed."""
+    return ENTITY_MATCHER.mask(text, fmt=' ')
+
+def residual_words(text: str) -> int:
+    """Number of words left once every entity span is removed."""
+    return len(_WORD_RE.findall(residual_text(text)))
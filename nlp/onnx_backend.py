@@ -0,0 +1,131 @@
+"""
+ONNX Runtime backend for the zero-shot intent classifier.
+
+export_onnx() converts a Hugging Face NLI sequence-classification model (the
+one the zero-shot pipeline uses) to ONNX and applies dynamic int8 weight
+quantization; OnnxZeroShot runs it on CPU through onnxruntime and returns the
+same {'sequence', 'labels', 'scores'} dicts as the transformers pipeline.
+"""
+import os, json, shutil, importlib.util
+from typing import Any, Dict, List, Optional, Sequence, Union
+import numpy as np
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+ONNX_DIR = os.path.join(MODEL_DIR, 'zero_shot_onnx')
+ONNX_FILE = 'model.int8.onnx'
+HYPOTHESIS_TEMPLATE = 'This example is {}.'
+
+# Intra-op threads per session; past a few threads small batches gain little and
+# compete with the server's other workers for cores.
+ONNX_INTRA_OP_THREADS = int(os.environ.get('ONNX_INTRA_OP_THREADS', str(min(4, os.cpu_count() or 1))))
+
+onnxruntime_available = importlib.util.find_spec('onnxruntime') is not None
+
+def _entailment_id(config: Dict[str, Any]) -> int:
+    for label, idx in (config.get('label2id') or {}).items():
+        if label.lower().startswith('entail'):
+            return int(idx)
+    return -1
+
+def export_onnx(model_name: str, out_dir: str = ONNX_DIR, quantize: bool = True, opset: int = 17) -> str:
+    """
+    Export model_name (hub id or local path) to out_dir/model.int8.onnx (or
+    model.onnx with quantize=False) along with its tokenizer and label config.
+    The directory is written next to out_dir and renamed into place.
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    model.config.return_dict = False
+
+    tmp_dir = out_dir.rstrip('/') + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    tokenizer.save_pretrained(tmp_dir)
+
+    sample = tokenizer(['premise'], ['This example is hypothesis.'], return_tensors='pt')
+    input_names = [n for n in ('input_ids', 'attention_mask', 'token_type_ids') if n in sample]
+    fp32_path = os.path.join(tmp_dir, 'model.onnx')
+    with torch.no_grad():
+        torch.onnx.export(
+            model, tuple(sample[n] for n in input_names), fp32_path,
+            input_names=input_names, output_names=['logits'],
+            dynamic_axes={**{n: {0: 'batch', 1: 'sequence'} for n in input_names}, 'logits': {0: 'batch'}},
+            opset_version=opset, do_constant_folding=True, dynamo=False,
+        )
+    model_file = 'model.onnx'
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(fp32_path, os.path.join(tmp_dir, ONNX_FILE), weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+        model_file = ONNX_FILE
+
+    with open(os.path.join(tmp_dir, 'onnx_config.json'), 'w') as f:
+        json.dump({
+            'source_model': model_name,
+            'model_file': model_file,
+            'quantized': quantize,
+            'input_names': input_names,
+            'label2id': {k: int(v) for k, v in model.config.label2id.items()},
+        }, f, indent=2)
+
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.replace(tmp_dir, out_dir)
+    return os.path.join(out_dir, model_file)
+
+def is_exported(model_dir: str = ONNX_DIR) -> bool:
+    return os.path.exists(os.path.join(model_dir, 'onnx_config.json'))
+
+class OnnxZeroShot:
+    """
+    Zero-shot classification over an exported NLI model: each (text, label)
+    pair becomes a premise/hypothesis input, and the entailment logits of one
+    text are softmaxed across labels, as in the transformers pipeline.
+    """
+    def __init__(self, model_dir: str = ONNX_DIR, intra_op_threads: int = ONNX_INTRA_OP_THREADS,
+                 hypothesis_template: str = HYPOTHESIS_TEMPLATE):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(model_dir, 'onnx_config.json')) as f:
+            self.config = json.load(f)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.hypothesis_template = hypothesis_template
+        self.entailment_id = _entailment_id(self.config)
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = max(1, intra_op_threads)
+        opts.inter_op_num_threads = 1
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.model_path = os.path.join(model_dir, self.config['model_file'])
+        self.session = ort.InferenceSession(self.model_path, opts, providers=['CPUExecutionProvider'])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def _entailment_logits(self, premises: List[str], hypotheses: List[str]) -> np.ndarray:
+        enc = self.tokenizer(premises, hypotheses, padding=True, truncation='only_first', return_tensors='np')
+        feed = {name: enc[name].astype(np.int64) for name in self.input_names}
+        logits = self.session.run(['logits'], feed)[0]
+        return logits[:, self.entailment_id]
+
+    def __call__(self, texts: Union[str, Sequence[str]], candidate_labels: Sequence[str],
+                 batch_size: Optional[int] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        labels = list(candidate_labels)
+        hypotheses = [self.hypothesis_template.format(label) for label in labels]
+        pairs = [(t, h) for t in texts for h in hypotheses]
+        step = batch_size or len(pairs)
+        chunks = [self._entailment_logits([p for p, _ in pairs[i:i + step]], [h for _, h in pairs[i:i + step]])
+                  for i in range(0, len(pairs), step)]
+        entail = np.concatenate(chunks).reshape(len(texts), len(labels)) if chunks else np.zeros((0, len(labels)))
+        exp = np.exp(entail - entail.max(axis=1, keepdims=True))
+        scores = exp / exp.sum(axis=1, keepdims=True)
+        out = []
+        for text, row in zip(texts, scores):
+            order = np.argsort(-row, kind='stable')
+            out.append({'sequence': text, 'labels': [labels[i] for i in order], 'scores': [float(row[i]) for i in order]})
+        return out[0] if single else out
@@ -38,7 +38,13 @@ class DialogPolicy:
         self.min_conf = min_conf
         self.auto_escalate_conf = auto_escalate_conf
 
-    def decide(self, intent: str, confidence: float, entities: Dict[str, Any], faq: Tuple[str, float]):
+    def missing_slots(self, intent: str, entities: Dict[str, Any]):
+        return [s for s in REQUIRED_SLOTS.get(intent, []) if s not in entities]
+
+    def decide(self, intent: str, confidence: float, entities: Dict[str, Any], faq: Tuple[str, float],
+               degraded: bool = False):
+        # degraded: the intent came from a cheaper tier because the server shed load;
+        # low confidence then asks the user to rephrase rather than opening a ticket.
         faq_answer, faq_score = faq
         result = {'reply': '', 'next_action': None}
 
@@ -54,7 +60,7 @@ class DialogPolicy:
             if faq_answer and faq_score >= 0.35:
                 result['reply'] = faq_answer
                 return result
-            if confidence < self.auto_escalate_conf:
+            if confidence < self.auto_escalate_conf and not degraded:
                 result['reply'] = "I'm having trouble here — I'll connect you with a human agent so we can resolve this quickly."
                 result['create_ticket'] = True
                 result['ticket_subject'] = "Auto-escalation - low confidence"
@@ -68,8 +74,7 @@ class DialogPolicy:
 
         # Slot filling
         if intent in REQUIRED_SLOTS:
-            required = REQUIRED_SLOTS[intent]
-            missing = [s for s in required if s not in entities]
+            missing = self.missing_slots(intent, entities)
             if missing:
                 result['reply'] = (result['reply'] + "\\n" if result['reply'] else "") + _slot_prompt(missing)
                 result['next_action'] = 'request_slots'
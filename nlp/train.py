@@ -1,10 +1,18 @@
 
-import json, os, joblib, pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
+import json, os, sys, time, zlib, joblib, argparse, itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Tuple
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import SGDClassifier
 from sklearn.svm import LinearSVC
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
+from sklearn.metrics import accuracy_score, classification_report, f1_score
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from nlp.faq_index import INDEX_DIR, build_index, prune_indexes, read_faq_csv
+from nlp.advanced_nlp import ZERO_SHOT_MODEL
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
@@ -20,7 +28,111 @@ def load_intents():
             labels.append(label)
     return texts, labels
 
-def main():
+# Streaming mode: linear models trained with partial_fit, one per grid point
+PARAM_GRID = {'loss': ['hinge', 'modified_huber', 'log_loss'], 'alpha': [1e-5, 1e-4]}
+
+def iter_jsonl(path: str) -> Iterator[Tuple[str, str]]:
+    """(text, intent) pairs from JSONL; accepts text/message/user_message and intent/label keys."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            text = row.get('text') or row.get('message') or row.get('user_message')
+            label = row.get('intent') or row.get('label')
+            if text and label:
+                yield text, label
+
+def iter_conversation_log(min_confidence: float = 0.0, page_size: int = 10000) -> Iterator[Tuple[str, str]]:
+    """(user_message, intent) pairs from ConversationLog, paged by id."""
+    from db import ConversationLog, SessionLocal
+    last_id = 0
+    while True:
+        with SessionLocal() as db:
+            rows = db.query(ConversationLog.id, ConversationLog.user_message, ConversationLog.intent).filter(
+                ConversationLog.id > last_id, ConversationLog.intent.isnot(None), ConversationLog.intent != 'unknown',
+                ConversationLog.confidence >= min_confidence,
+            ).order_by(ConversationLog.id).limit(page_size).all()
+        if not rows:
+            return
+        for r in rows:
+            if r.user_message:
+                yield r.user_message, r.intent
+        last_id = rows[-1].id
+
+def chunked(pairs: Iterator[Tuple[str, str]], size: int) -> Iterator[Tuple[List[str], List[str]]]:
+    while True:
+        chunk = list(itertools.islice(pairs, size))
+        if not chunk:
+            return
+        texts, labels = zip(*chunk)
+        yield list(texts), list(labels)
+
+def is_holdout(text: str, percent: float) -> bool:
+    # Stable across passes without keeping the split in memory
+    return zlib.crc32(text.encode('utf-8')) % 100 < percent
+
+def train_streaming(source: Callable[[], Iterator[Tuple[str, str]]], chunk_size: int = 10000, epochs: int = 5,
+                    n_features: int = 2 ** 18, holdout_percent: float = 5.0, jobs: int = os.cpu_count() or 1,
+                    param_grid: Dict[str, list] = PARAM_GRID, seed: int = 42):
+    """
+    Out-of-core training. source() re-reads the examples on every pass, so
+    memory is bounded by chunk_size and the model size. Each chunk is hashed
+    once and every candidate of the grid is updated with partial_fit in a
+    thread pool (SGD releases the GIL); the held-out slice is scored in a
+    final pass and the best macro-F1 candidate is returned as a pipeline.
+    Shuffle large inputs beforehand: only rows within a chunk are shuffled.
+    """
+    vectorizer = HashingVectorizer(ngram_range=(1, 2), n_features=n_features, alternate_sign=False, norm='l2')
+    classes = np.array(sorted({label for _, label in source()}))
+    if len(classes) < 2:
+        raise ValueError(f'need examples of at least two intents, found {len(classes)}')
+    candidates = [dict(zip(param_grid, values)) for values in itertools.product(*param_grid.values())]
+    models = [SGDClassifier(random_state=seed, **params) for params in candidates]
+    rng = np.random.default_rng(seed)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for epoch in range(epochs):
+            seen = 0
+            for texts, labels in chunked(source(), chunk_size):
+                keep = [i for i, t in enumerate(texts) if not is_holdout(t, holdout_percent)]
+                if not keep:
+                    continue
+                keep = rng.permutation(keep)
+                X = vectorizer.transform([texts[i] for i in keep])
+                y = np.array([labels[i] for i in keep])
+                list(pool.map(lambda m: m.partial_fit(X, y, classes=classes), models))
+                seen += len(keep)
+            print(f'epoch {epoch + 1}/{epochs}: {seen} training examples')
+
+        y_true, y_pred = [], [[] for _ in models]
+        for texts, labels in chunked(source(), chunk_size):
+            held = [i for i, t in enumerate(texts) if is_holdout(t, holdout_percent)]
+            if not held:
+                continue
+            X = vectorizer.transform([texts[i] for i in held])
+            y_true.extend(labels[i] for i in held)
+            for preds, out in zip(pool.map(lambda m: m.predict(X), models), y_pred):
+                out.extend(preds)
+
+    if not y_true:
+        print('No held-out examples; keeping the first candidate.')
+        best = 0
+    else:
+        scores = [f1_score(y_true, preds, average='macro', zero_division=0) for preds in y_pred]
+        print('Hyperparameter search (held-out macro F1 / accuracy):')
+        for params, score, preds in zip(candidates, scores, y_pred):
+            print(f'  {params}: {score:.4f} / {accuracy_score(y_true, preds):.4f}')
+        best = int(np.argmax(scores))
+        print('Best:', candidates[best])
+        print(classification_report(y_true, y_pred[best], zero_division=0))
+
+    clf = models[best]
+    if np.count_nonzero(clf.coef_) < 0.25 * clf.coef_.size:
+        clf.sparsify()  # most hashed features never occur; keeps the artifact small
+    return Pipeline([('hash', vectorizer), ('clf', clf)])
+
+def train_in_memory():
     X, y = load_intents()
     if len(X) == 0:
         print("No training data found in intents.json — creating a tiny default model.")
@@ -46,19 +158,77 @@ def main():
         print(classification_report(y_test, y_pred))
     except Exception as e:
         print("Could not evaluate on holdout:", e)
+    return pipeline
+
+def peak_memory_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def export_zero_shot(model_name: str, quantize: bool = True):
+    try:
+        from nlp.onnx_backend import ONNX_DIR, export_onnx
+        path = export_onnx(model_name, ONNX_DIR, quantize=quantize)
+    except ImportError as e:
+        print("Skipping ONNX export (needs torch, transformers, onnx and onnxruntime):", e)
+        return
+    print('Saved zero-shot ONNX model to', path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train the intent classifier and build the FAQ index.')
+    parser.add_argument('--export-onnx', action='store_true',
+                        help='also export the zero-shot model to ONNX (int8) for the onnxruntime backend')
+    parser.add_argument('--zero-shot-model', default=ZERO_SHOT_MODEL)
+    parser.add_argument('--no-quantize', action='store_true', help='keep the ONNX export in fp32')
+    stream = parser.add_argument_group('streaming training (hashing features + partial_fit, for large label sets)')
+    stream.add_argument('--stream', metavar='SOURCE',
+                        help="JSONL file of {text, intent} rows, or 'db' for the conversation log")
+    stream.add_argument('--chunk-size', type=int, default=10000)
+    stream.add_argument('--epochs', type=int, default=5)
+    stream.add_argument('--n-features', type=int, default=2 ** 18)
+    stream.add_argument('--holdout-percent', type=float, default=5.0)
+    stream.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='threads for the hyperparameter search')
+    stream.add_argument('--min-confidence', type=float, default=0.0,
+                        help="with --stream db, only use turns logged with at least this confidence")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.stream:
+        source = args.stream
+        if source == 'db':
+            examples = lambda: iter_conversation_log(args.min_confidence)
+        else:
+            examples = lambda: iter_jsonl(source)
+        pipeline = train_streaming(examples, chunk_size=args.chunk_size, epochs=args.epochs,
+                                   n_features=args.n_features, holdout_percent=args.holdout_percent, jobs=args.jobs)
+    else:
+        pipeline = train_in_memory()
+    peak = peak_memory_mb()
+    print(f'Training wall time: {time.perf_counter() - started:.2f}s'
+          + (f', peak memory: {peak:.0f} MiB' if peak is not None else ''))
 
     os.makedirs(MODEL_DIR, exist_ok=True)
-    joblib.dump(pipeline, os.path.join(MODEL_DIR, 'intent_clf.joblib'))
+    # Write-then-rename so a running server's artifact watcher never sees a partial file
+    tmp_path = os.path.join(MODEL_DIR, '.intent_clf.joblib.tmp')
+    joblib.dump(pipeline, tmp_path)
+    os.replace(tmp_path, os.path.join(MODEL_DIR, 'intent_clf.joblib'))
     print("Saved intent_clf.joblib")
 
-    # Fit FAQ vectorizer on questions
+    # Build the memory-mapped FAQ index (vectorizer + normalized question matrix + answers)
     faq_path = os.path.join(DATA_DIR, 'faq.csv')
     if os.path.exists(faq_path):
-        df = pd.read_csv(faq_path)
-        if 'question' in df.columns:
-            vect = TfidfVectorizer(ngram_range=(1,2), min_df=1).fit(df['question'].astype(str).tolist())
-            joblib.dump(vect, os.path.join(MODEL_DIR, 'faq_vectorizer.joblib'))
-            print('Saved FAQ vectorizer.')
+        questions, _ = read_faq_csv(faq_path)
+        if questions:
+            path = build_index(faq_path, INDEX_DIR, replace=True)
+            prune_indexes(INDEX_DIR, keep=path)
+            print('Saved FAQ index to', path)
+
+    if args.export_onnx:
+        export_zero_shot(args.zero_shot_model, quantize=not args.no_quantize)
 
 if __name__ == '__main__':
     main()
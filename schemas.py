@@ -14,9 +14,18 @@ class ChatResponse(BaseModel):
     faq_answer: Optional[str] = None
     next_action: Optional[str] = None
     ticket_id: Optional[int] = None
+    degraded: bool = False  # answered by a cheaper path because the server was overloaded
 
 class TicketCreate(BaseModel):
     user_id: str
     conversation_id: Optional[str] = None
     subject: str
     details: str
+
+class BatchChatRequest(BaseModel):
+    requests: List[ChatRequest]
+    dry_run: bool = False
+    stream: bool = False
+
+class BatchChatResponse(BaseModel):
+    results: List[ChatResponse]
@@ -0,0 +1,90 @@
+import time, threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+class DialogSession:
+    __slots__ = ('intent', 'confidence', 'slots', 'missing', 'touched')
+
+    def __init__(self, intent: str, confidence: float, slots: Dict[str, Any], missing: tuple):
+        self.intent = intent
+        self.confidence = confidence
+        self.slots = slots
+        self.missing = missing
+        self.touched = time.monotonic()
+
+class SessionStore:
+    """
+    Per-conversation dialog state between turns: the intent whose slots the
+    bot asked for, the slots filled so far and the ones still missing.
+    - Bounded to max_sessions (least recently used evicted first); a session
+      expires ttl seconds after it was last touched.
+    - followup() returns the pending session when a message supplies one of the
+      missing slots and little else, so the caller can skip intent
+      classification and FAQ search for it. If the few other words carry an
+      intent of their own ("cancel order <id>"), the user has moved on and the
+      session is dropped.
+    """
+    def __init__(self, max_sessions: int = 100000, ttl: float = 900.0, max_extra_words: int = 5):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_extra_words = max_extra_words
+        self._data: 'OrderedDict[str, DialogSession]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.followups = 0
+        self.switches = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _get(self, conv_id: str, now: float) -> Optional[DialogSession]:
+        session = self._data.get(conv_id)
+        if session is not None and now - session.touched > self.ttl:
+            del self._data[conv_id]
+            self.expirations += 1
+            return None
+        return session
+
+    def get(self, conv_id: str) -> Optional[DialogSession]:
+        with self._lock:
+            return self._get(conv_id, time.monotonic())
+
+    def set_pending(self, conv_id: str, intent: str, confidence: float, slots: Dict[str, Any], missing: Iterable[str]):
+        session = DialogSession(intent, confidence, dict(slots), tuple(missing))
+        with self._lock:
+            self._data[conv_id] = session
+            self._data.move_to_end(conv_id)
+            while len(self._data) > self.max_sessions:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, conv_id: str):
+        with self._lock:
+            self._data.pop(conv_id, None)
+
+    def followup(self, conv_id: str, entities: Dict[str, Any], extra_words: int,
+                 intent: Optional[str] = None) -> Optional[DialogSession]:
+        """intent: what a cheap classifier confidently makes of the words around the entities, if anything."""
+        if not conv_id or extra_words > self.max_extra_words:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            session = self._get(conv_id, now)
+            if session is None or not any(slot in entities for slot in session.missing):
+                return None
+            if intent is not None and intent != session.intent:
+                del self._data[conv_id]
+                self.switches += 1
+                return None
+            session.touched = now
+            self._data.move_to_end(conv_id)
+            self.followups += 1
+            return session
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'sessions': len(self._data),
+                'followups': self.followups,
+                'switches': self.switches,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
@@ -8,22 +8,49 @@ export default function App() {
   ])
   const [input, setInput] = useState('')
 
+  function appendToLastBot(text, replace = false) {
+    setMessages(prev => {
+      const next = prev.slice()
+      const last = next[next.length - 1]
+      next[next.length - 1] = { ...last, text: replace ? text : last.text + text }
+      return next
+    })
+  }
+
   async function sendMessage() {
     const text = input.trim()
     if (!text) return
-    setMessages(prev => [...prev, { sender: 'user', text }])
+    setMessages(prev => [...prev, { sender: 'user', text }, { sender: 'bot', text: '' }])
     setInput('')
 
     try {
-      const r = await fetch(`${API_BASE}/chat`, {
+      const r = await fetch(`${API_BASE}/chat/stream`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ message: text, user_id: 'web-user', conversation_id: 'conv-web' })
       })
-      const data = await r.json()
-      setMessages(prev => [...prev, { sender: 'bot', text: data.reply }])
+      // Server-sent events: tokens are appended as they arrive, `done` carries the final reply
+      const reader = r.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      while (true) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        let sep
+        while ((sep = buffer.indexOf('\n\n')) !== -1) {
+          const block = buffer.slice(0, sep)
+          buffer = buffer.slice(sep + 2)
+          const event = (block.match(/^event: (.*)$/m) || [])[1]
+          const data = (block.match(/^data: (.*)$/m) || [])[1]
+          if (!data) continue
+          const payload = JSON.parse(data)
+          if (event === 'token') appendToLastBot(payload.text)
+          if (event === 'done') appendToLastBot(payload.reply, true)
+        }
+      }
     } catch (e) {
-      setMessages(prev => [...prev, { sender: 'bot', text: 'Network error. Is the backend running on :8000?' }])
+      appendToLastBot('Network error. Is the backend running on :8000?', true)
     }
   }
 
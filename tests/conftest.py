@@ -0,0 +1,5 @@
+import os, tempfile
+
+# Keep test runs out of the checked-in chatbot.db
+os.environ.setdefault('ADMIN_TOKEN', 'test-admin-token')
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='chatbot-test-'), 'chatbot.db'))
@@ -0,0 +1,34 @@
+"""
+Minimal OpenAI-compatible /chat/completions server for tests and benchmarks.
+
+    uvicorn tests.fake_llm:app --port 9000
+    OPENAI_API_KEY=test OPENAI_API_BASE=http://127.0.0.1:9000/v1 uvicorn app:app
+
+FAKE_LLM_DELAY (seconds) is slept before answering; FAKE_LLM_TOKEN_DELAY between streamed tokens.
+"""
+import os, json, asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+REPLY = "Thanks for reaching out! Could you share a few more details so I can help?"
+
+app = FastAPI(title='Fake LLM')
+app.state.delay = float(os.environ.get('FAKE_LLM_DELAY', '0'))
+app.state.token_delay = float(os.environ.get('FAKE_LLM_TOKEN_DELAY', '0'))
+app.state.requests = 0
+
+@app.post('/v1/chat/completions')
+async def completions(request: Request):
+    body = await request.json()
+    app.state.requests += 1
+    await asyncio.sleep(app.state.delay)
+    if not body.get('stream'):
+        return {'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': REPLY}, 'finish_reason': 'stop'}]}
+
+    async def chunks():
+        for word in REPLY.split(' '):
+            if app.state.token_delay:
+                await asyncio.sleep(app.state.token_delay)
+            yield 'data: ' + json.dumps({'choices': [{'index': 0, 'delta': {'content': word + ' '}}]}) + '\n\n'
+        yield 'data: [DONE]\n\n'
+    return StreamingResponse(chunks(), media_type='text/event-stream')
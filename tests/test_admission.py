@@ -0,0 +1,41 @@
+import time, asyncio, threading
+from nlp.admission import AdmissionGate, AsyncAdmissionGate, request_deadline
+from nlp.policy import DialogPolicy
+
+def test_gate_rejects_when_queue_full_or_wait_exceeded():
+    gate = AdmissionGate('t', max_concurrent=1, max_queue=1, max_wait_ms=50)
+    assert gate.acquire()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(gate.acquire()))
+    waiter.start()
+    time.sleep(0.01)
+    assert gate.acquire() is False          # queue of one already taken
+    waiter.join()
+    assert results == [False]               # waited 50ms, slot never freed
+    gate.release()
+    with gate.slot() as admitted:
+        assert admitted
+    token = request_deadline.set(time.monotonic() - 1)
+    try:
+        assert gate.acquire() is False
+    finally:
+        request_deadline.reset(token)
+    assert gate.stats()['rejected'] == {'queue_full': 1, 'timeout': 1, 'deadline': 1}
+    assert gate.stats()['in_flight'] == 0
+
+def test_async_gate_hands_slot_to_waiter():
+    async def run():
+        gate = AsyncAdmissionGate('t', max_concurrent=1, max_queue=4, max_wait_ms=500)
+        assert await gate.acquire()
+        waiter = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0.01)
+        gate.release()
+        assert await waiter
+        gate.release()
+        return gate.stats()
+    stats = asyncio.run(run())
+    assert stats['admitted'] == 2 and stats['in_flight'] == 0 and stats['queued'] == 0
+
+def test_degraded_low_confidence_does_not_open_ticket():
+    decision = DialogPolicy().decide('unknown', 0.0, {}, (None, 0.0), degraded=True)
+    assert not decision.get('create_ticket')
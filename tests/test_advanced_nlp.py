@@ -0,0 +1,84 @@
+import nlp.advanced_nlp as advanced_nlp
+from nlp.advanced_nlp import AdvancedNLP
+from nlp.admission import AdmissionGate
+
+class FakeZeroShot:
+    def __init__(self):
+        self.calls = 0
+    def __call__(self, texts, labels, batch_size=None):
+        self.calls += 1
+        return [{'labels': ['complaint'] + [l for l in labels if l != 'complaint'],
+                 'scores': [0.9] + [0.1 / (len(labels) - 1)] * (len(labels) - 1)} for _ in texts]
+
+def make_nlp(monkeypatch, **kwargs):
+    monkeypatch.setattr(advanced_nlp, '_zero_shot_available', False)
+    nlp = AdvancedNLP(**kwargs)
+    nlp.fallback = None
+    nlp.zero_shot = FakeZeroShot()
+    return nlp
+
+def test_cascade_answers_confident_messages_cheaply(monkeypatch):
+    nlp = make_nlp(monkeypatch, cascade=True, cascade_threshold=0.6)
+    label, conf, meta = nlp.classify_intent('where is my order')
+    assert label == 'track_order' and meta['tier'] == 'keyword'
+    assert nlp.zero_shot.calls == 0
+
+    label, conf, meta = nlp.classify_intent('this product arrived broken')
+    assert label == 'complaint' and meta['tier'] == 'zero_shot'
+    assert nlp.zero_shot.calls == 1
+    assert nlp.tier_stats()['hits'] == {'keyword': 1, 'zero_shot': 1}
+
+def test_default_mode_prefers_zero_shot(monkeypatch):
+    nlp = make_nlp(monkeypatch, cascade=False)
+    label, _, meta = nlp.classify_intent('hello there')
+    assert label == 'complaint' and meta['tier'] == 'zero_shot'
+
+def test_cascade_sends_single_keyword_hits_to_zero_shot(monkeypatch):
+    nlp = make_nlp(monkeypatch, cascade=True, cascade_threshold=0.6)
+    messages = ['do you ship to canada', 'they never delivered my parcel', 'this charge on my card is wrong',
+                'what is your return policy for this item', 'hello there']
+    for text in messages:
+        label, _, meta = nlp.classify_intent(text)
+        assert (label, meta['tier']) == ('complaint', 'zero_shot'), text
+    assert nlp.zero_shot.calls == len(messages)
+
+def test_keywords_match_whole_words():
+    nlp = AdvancedNLP.__new__(AdvancedNLP)
+    nlp.cascade = True
+    for text in ('do you ship to canada', 'they never delivered my parcel', 'this charge on my card is wrong',
+                 'what is your return policy for this item'):
+        assert nlp._classify_keywords(text) is None, text
+    assert nlp._classify_keywords('Hello!') == ('greet', 0.6, {})
+    assert nlp._classify_keywords('hello there') == ('greet', 0.5, {})
+    assert nlp._classify_keywords('where is my order 123') == ('track_order', 0.6, {})
+
+def test_keywords_match_inflected_forms():
+    nlp = AdvancedNLP.__new__(AdvancedNLP)
+    nlp.cascade = False
+    assert nlp._classify_keywords('I need tracking info') == ('track_order', 0.6, {})
+    assert nlp._classify_keywords('any news on my refunds?') == ('refund_status', 0.6, {})
+    assert nlp._classify_keywords('hello there') == ('greet', 0.6, {})
+    nlp.cascade = True
+    assert nlp._classify_keywords('any news on my refunds?') == ('refund_status', 0.5, {})
+    assert nlp._classify_keywords('Refunds') == ('refund_status', 0.6, {})
+
+def test_shed_zero_shot_degrades_to_keywords(monkeypatch):
+    nlp = make_nlp(monkeypatch, cascade=False)
+    nlp.admission = AdmissionGate('zero_shot', max_concurrent=1, max_queue=0)
+    nlp.admission.acquire()                 # saturate
+    label, conf, meta = nlp.classify_intent('hello there')
+    assert label == 'greet' and meta['tier'] == 'keyword' and meta['degraded']
+    assert nlp.zero_shot.calls == 0
+    nlp.admission.release()
+    assert nlp.classify_intent('hello there')[2]['tier'] == 'zero_shot'
+
+def test_zero_shot_gate_admits_full_batches_when_batching(monkeypatch):
+    import sys, types
+    monkeypatch.setattr(advanced_nlp, '_zero_shot_available', True)
+    monkeypatch.setitem(sys.modules, 'transformers', types.SimpleNamespace(pipeline=lambda *a, **kw: FakeZeroShot()))
+    batched = AdvancedNLP(batching=True, max_batch_size=8, max_concurrent=2, zero_shot_backend='torch')
+    try:
+        assert batched.admission.max_concurrent == 16
+    finally:
+        batched.close()
+    assert AdvancedNLP(batching=False, max_concurrent=2, zero_shot_backend='torch').admission.max_concurrent == 2
@@ -0,0 +1,90 @@
+import datetime
+from fastapi.testclient import TestClient
+from analytics import RollupAggregator, backfill
+from sqlalchemy.orm import sessionmaker
+from db import AnalyticsRollup, Base, ConversationLog, make_engine
+import app as app_module
+
+def temp_sessions(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'analytics.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+def test_rollups_accumulate_and_flush(tmp_path):
+    SessionLocal = temp_sessions(tmp_path)
+    agg = RollupAggregator(SessionLocal, flush_interval=60)
+    agg.record('track_order', 0.9, 'policy')
+    agg.record('track_order', 0.7, 'faq')
+    agg.record('escalate', 0.8, 'escalated', ticket_id=7)
+    before = agg.summary(24)
+    agg.flush()
+    after = agg.summary(24)
+    assert before == after
+    assert after['turns'] == 3 and after['intents'] == {'track_order': 2, 'escalate': 1}
+    assert abs(after['avg_confidence'] - 0.8) < 1e-9
+    assert abs(after['faq_deflection_rate'] - 1 / 3) < 1e-9 and after['tickets'] == 1
+
+    agg.record('track_order', 0.5, 'llm')
+    agg.flush()
+    with SessionLocal() as db:
+        row = db.query(AnalyticsRollup).filter(AnalyticsRollup.intent == 'track_order').one()
+        assert row.turns == 3 and row.llm_replies == 1
+
+def test_backfill_rebuilds_hours_up_to_the_first_live_one(tmp_path):
+    SessionLocal = temp_sessions(tmp_path)
+    now = datetime.datetime.utcnow()
+    two_hours_ago = now - datetime.timedelta(hours=2)
+    with SessionLocal() as db:
+        # 'escalate' two hours ago was logged before live recording started in that same hour
+        for ts, intent, outcome in [(now - datetime.timedelta(hours=30), 'greet', 'policy'),
+                                    (now - datetime.timedelta(hours=30), 'greet', 'faq'),
+                                    (two_hours_ago, 'escalate', 'escalated'), (two_hours_ago, 'greet', 'policy'),
+                                    (now, 'greet', 'policy')]:
+            db.add(ConversationLog(intent=intent, confidence=0.5, outcome=outcome, timestamp=ts))
+        db.commit()
+    agg = RollupAggregator(SessionLocal)
+    agg.record('greet', 0.5, 'policy', timestamp=two_hours_ago)  # the live turns
+    agg.record('greet', 0.5, 'policy', timestamp=now)
+    agg.flush()
+
+    result = backfill(SessionLocal)
+    assert result['rows'] == 4
+    summary = agg.summary(48)
+    assert summary['turns'] == 5 and summary['intents'] == {'greet': 4, 'escalate': 1}
+    assert backfill(SessionLocal)['rows'] == 2
+    assert agg.summary(48) == summary
+
+    backfill(SessionLocal, rebuild=True)
+    assert agg.summary(48) == summary
+    assert len(agg.hourly(48)) == 3
+
+def test_backfill_waits_for_the_first_live_hour_to_close(tmp_path):
+    SessionLocal = temp_sessions(tmp_path)
+    with SessionLocal() as db:
+        db.add(ConversationLog(intent='greet', confidence=0.5, outcome='policy', timestamp=datetime.datetime.utcnow()))
+        db.commit()
+    agg = RollupAggregator(SessionLocal)
+    agg.record('escalate', 0.5, 'escalated')
+    agg.flush()
+    result = backfill(SessionLocal)
+    assert result['rows'] == 0 and 'deferred_until' in result
+    assert agg.summary(1)['intents'] == {'escalate': 1}
+
+def test_analytics_endpoints():
+    client = TestClient(app_module.app)
+    client.post('/chat', json={'message': 'hello', 'conversation_id': 'analytics'})
+    summary = client.get('/analytics/summary', params={'hours': 1}).json()
+    assert summary['turns'] >= 1 and 'faq_deflection_rate' in summary
+    assert client.get('/analytics/hourly').json()['buckets'][-1]['turns'] >= 1
+
+def test_persisted_batch_results_are_rolled_up(tmp_path):
+    from batch import persist_results
+    SessionLocal = temp_sessions(tmp_path)
+    agg = RollupAggregator(SessionLocal)
+    items = [{'message': 'where is my order'}, {'message': 'talk to a human'}]
+    results = [dict(intent=intent, confidence=0.9, outcome=outcome, create_ticket=False, ticket_subject=None,
+                    ticket_id=None, entities={}, reply='ok', model_version='test')
+               for intent, outcome in [('track_order', 'policy'), ('escalate', 'escalated')]]
+    persist_results(items, results, SessionLocal, agg)
+    agg.flush()
+    assert agg.summary(1)['intents'] == {'track_order': 1, 'escalate': 1}
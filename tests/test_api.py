@@ -1,3 +1,4 @@
+import json, os
 from fastapi.testclient import TestClient
 from app import app
 
@@ -14,3 +15,91 @@ def test_chat_greet():
     data = r.json()
     assert 'reply' in data
     assert isinstance(data['intent'], str)
+
+def test_chat_stream_greet():
+    r = client.post('/chat/stream', json={'message': 'hello'})
+    assert r.status_code == 200
+    assert r.headers['content-type'].startswith('text/event-stream')
+    events = [block.split('\n')[0] for block in r.text.strip().split('\n\n')]
+    assert events[0] == 'event: meta'
+    assert 'event: token' in events
+    assert events[-1] == 'event: done'
+
+def test_ready_after_warm_up():
+    from app import registry
+    registry.warm_up()
+    r = client.get('/ready')
+    assert r.status_code == 200
+    assert r.json()['ready'] is True
+
+def test_model_reload_swaps_version_and_logs_it():
+    from app import registry
+    from db import ConversationLog
+    before = registry.get('models')
+    assert client.post('/admin/models/reload').status_code == 403
+    r = client.post('/admin/models/reload', headers={'X-Admin-Token': os.environ['ADMIN_TOKEN']})
+    assert r.status_code == 200
+    assert registry.get('models') is not before
+    assert client.get('/admin/models').json()['status']['reloads'] >= 1
+
+    client.post('/chat', json={'message': 'where is my order', 'conversation_id': 'reload-test'})
+    with registry.get('db')() as db:
+        row = db.query(ConversationLog).filter(ConversationLog.conversation_id == 'reload-test').first()
+    assert row.model_version == r.json()['version']
+
+def test_model_reload_is_refused_without_admin_token(monkeypatch):
+    import app
+    monkeypatch.setattr(app, 'ADMIN_TOKEN', None)
+    r = client.post('/admin/models/reload', headers={'X-Admin-Token': ''})
+    assert r.status_code == 403
+
+def test_chat_batch_preserves_order():
+    messages = ['hello', 'talk to a human', 'where is my order 123-4567890-1234567', 'bye']
+    r = client.post('/chat/batch', json={'requests': [{'message': m} for m in messages], 'dry_run': True})
+    assert r.status_code == 200
+    results = r.json()['results']
+    assert len(results) == len(messages)
+    assert results[2]['entities'].get('order_id') == '123-4567890-1234567'
+    assert all(res['ticket_id'] is None for res in results)
+
+def test_chat_batch_stream_jsonl():
+    r = client.post('/chat/batch', json={'requests': [{'message': 'hi'}, {'message': 'refund'}], 'stream': True})
+    assert r.status_code == 200
+    lines = [json.loads(l) for l in r.text.splitlines() if l]
+    assert len(lines) == 2 and all('reply' in l for l in lines)
+
+def test_metrics_endpoint():
+    client.post('/chat', json={'message': 'hello'})
+    r = client.get('/metrics')
+    assert r.status_code == 200
+    assert r.headers['content-type'].startswith('text/plain')
+    assert 'chat_requests_total{endpoint="/chat"}' in r.text
+    assert 'chat_stage_seconds_bucket{stage="extract_entities"' in r.text
+
+def test_slot_followup_skips_classification():
+    from app import registry
+    bundle = registry.get('models')
+    calls = []
+    classify = bundle.nlp.classify_intent
+    bundle.nlp.classify_intent = lambda text: calls.append(text) or classify(text)
+    try:
+        r = client.post('/chat', json={'message': 'where is my order', 'conversation_id': 'session-test'})
+        assert r.json()['next_action'] == 'request_slots'
+        r = client.post('/chat', json={'message': 'it is 123-4567890-1234567', 'conversation_id': 'session-test'})
+    finally:
+        del bundle.nlp.classify_intent
+    data = r.json()
+    assert data['intent'] == 'track_order'
+    assert data['next_action'] == 'fulfill_track_order'
+    assert data['ticket_id'] is None
+    assert 'it is 123-4567890-1234567' not in calls
+    assert client.get('/stats').json()['sessions']['followups'] >= 1
+
+def test_slot_followup_with_new_intent_is_reclassified():
+    r = client.post('/chat', json={'message': 'where is my order', 'conversation_id': 'session-switch'})
+    assert r.json()['next_action'] == 'request_slots'
+    r = client.post('/chat', json={'message': 'refund for 123-4567890-1234567 please', 'conversation_id': 'session-switch'})
+    data = r.json()
+    assert data['intent'] == 'refund_status'
+    assert data['next_action'] == 'fulfill_refund_status'
+    assert client.get('/stats').json()['sessions']['switches'] >= 1
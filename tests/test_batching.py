@@ -0,0 +1,75 @@
+import threading
+from nlp.batching import MicroBatcher
+
+def test_concurrent_submits_are_coalesced():
+    calls = []
+    def fn(items):
+        calls.append(list(items))
+        return [x * 2 for x in items]
+
+    batcher = MicroBatcher(fn, max_batch_size=8, max_wait_ms=50)
+    results = {}
+    barrier = threading.Barrier(8)
+    def worker(i):
+        barrier.wait()
+        results[i] = batcher.submit(i)
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert results == {i: i * 2 for i in range(8)}
+    assert len(calls) < 8
+    stats = batcher.stats()
+    assert stats['items'] == 8
+    assert stats['max_batch_size'] > 1
+    assert stats['mean_queue_wait_ms'] >= 0.0
+
+def test_errors_fan_out_to_callers():
+    def fn(items):
+        raise ValueError('boom')
+    batcher = MicroBatcher(fn, max_batch_size=4, max_wait_ms=1)
+    try:
+        batcher.submit('x')
+        assert False, 'expected ValueError'
+    except ValueError:
+        pass
+    finally:
+        batcher.close()
+
+def test_submits_racing_close_never_hang():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=4, max_wait_ms=1)
+    outcomes = []
+    def worker():
+        for i in range(200):
+            try:
+                outcomes.append(batcher.submit(i, timeout=5))
+            except RuntimeError:
+                outcomes.append('closed')
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    batcher.close()
+    for t in threads:
+        t.join(10)
+    assert not any(t.is_alive() for t in threads)
+    assert len(outcomes) == 800
+    try:
+        batcher.submit('after')
+        assert False, 'expected RuntimeError'
+    except RuntimeError:
+        pass
+
+def test_items_left_behind_stop_fail_with_closed():
+    from concurrent.futures import Future
+    from nlp.batching import _STOP
+    batcher = MicroBatcher(lambda items: items, max_batch_size=4, max_wait_ms=1)
+    stranded = Future()
+    with batcher._submit_lock:
+        batcher._closed = True
+        batcher._queue.put(_STOP)
+        batcher._queue.put(('late', stranded, 0.0))
+    batcher._thread.join(5)
+    assert isinstance(stranded.exception(timeout=1), RuntimeError)
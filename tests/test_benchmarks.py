@@ -0,0 +1,48 @@
+from benchmarks.common import generate_traffic, summarize
+from benchmarks.faq_scale import bench_size, make_queries
+from benchmarks.matcher import bench_entities, bench_keywords
+from benchmarks.db_contention import bench_config
+from benchmarks.overload import SerialZeroShot
+
+def test_traffic_generator_is_deterministic():
+    a = generate_traffic(50, seed=3)
+    assert a == generate_traffic(50, seed=3)
+    assert all(r['message'] and r['conversation_id'] for r in a)
+
+def test_summarize_percentiles():
+    s = summarize([i / 1000.0 for i in range(1, 101)])
+    assert s['count'] == 100 and s['p50'] <= s['p95'] <= s['p99'] <= s['max']
+
+def test_faq_scale_smoke():
+    result = bench_size(500, make_queries(20), batch_size=8, persist=True)
+    assert result['rows'] == 500
+    assert result['search_ms']['count'] == 20
+    assert result['search_many_queries_per_s'] > 0
+
+def test_matcher_bench_smoke():
+    messages = [r['message'] for r in generate_traffic(30)]
+    assert bench_keywords(50, messages, repeat=1)['patterns'] == 50
+    assert bench_entities(5, messages, repeat=1)['patterns'] == 5
+
+def test_db_contention_smoke():
+    from db import sqlite_pragmas
+    result = bench_config('wal_tuned', sqlite_pragmas(), writers=2, readers=2, seconds=0.3, conversations=10, seed_rows=100)
+    assert result['writes_per_s'] > 0 and result['reads_per_s'] > 0
+
+def test_overload_zero_shot_stand_in():
+    out = SerialZeroShot(0.0)(['hello', 'my parcel is broken'], ['greet', 'complaint', 'escalate'])
+    assert [r['labels'][0] for r in out] == ['greet', 'complaint']
+    assert out[1]['scores'][0] < 0.5
+
+def test_onnx_zero_shot_bench_smoke(tmp_path):
+    import pytest
+    for mod in ('torch', 'transformers', 'onnxruntime', 'onnx'):
+        pytest.importorskip(mod)
+    from test_onnx_backend import LABELS, TEXTS, make_tiny_nli_model
+    from nlp.onnx_backend import export_onnx
+    from benchmarks.onnx_zero_shot import bench_backends
+    model = make_tiny_nli_model(tmp_path / 'tiny')
+    export_onnx(model, str(tmp_path / 'int8'), quantize=True)
+    [result] = bench_backends(model, str(tmp_path / 'int8'), TEXTS, LABELS, batch_sizes=[4], repeat=1)
+    assert result['torch_ms']['count'] == result['onnx_ms']['count'] == 3
+    assert result['speedup_p50'] > 0
@@ -0,0 +1,63 @@
+import time
+from cache import HistoryCache
+
+def test_cold_miss_then_hits():
+    cache = HistoryCache(max_turns=4)
+    assert cache.get('c1', 4) is None
+    cache.fill('c1', [{'user': 'hi', 'bot': 'hello'}])
+    cache.append('c1', 'track', 'order id?')
+    assert cache.get('c1', 4) == [{'user': 'hi', 'bot': 'hello'}, {'user': 'track', 'bot': 'order id?'}]
+    for i in range(5):
+        cache.append('c1', f'u{i}', f'b{i}')
+    assert [t['user'] for t in cache.get('c1', 4)] == ['u1', 'u2', 'u3', 'u4']
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 1
+
+def test_fill_merges_turns_not_yet_in_db():
+    cache = HistoryCache(max_turns=8)
+    cache.append('c1', 'b', '2')
+    cache.append('c1', 'c', '3')
+    assert cache.get('c1', 8) is None
+    # DB already has 'b' (written) but not 'c' (still queued)
+    cache.fill('c1', [{'user': 'a', 'bot': '1'}, {'user': 'b', 'bot': '2'}])
+    assert [t['user'] for t in cache.get('c1', 8)] == ['a', 'b', 'c']
+
+def test_lru_eviction_by_size_and_ttl():
+    cache = HistoryCache(max_bytes=2000, ttl=0.05, max_turns=4)
+    for i in range(20):
+        cache.fill(f'c{i}', [{'user': 'x' * 50, 'bot': 'y' * 50}])
+    assert cache.stats()['bytes'] <= 2000
+    assert cache.stats()['evictions'] > 0
+    assert cache.get('c0', 4) is None
+    assert cache.get('c19', 4) is not None
+    time.sleep(0.06)
+    assert cache.get('c19', 4) is None
+    assert cache.stats()['expirations'] >= 1
+
+def test_normalized_messages_share_nlu_entry():
+    from cache import NLUCache, normalize_message
+    assert normalize_message('Where is my order 123-4567890-1234567 ?!') == \
+        normalize_message('where  is my ORDER 999-1234567-7654321')
+    cache = NLUCache(max_entries=2)
+    cache.put('Hi!', ('greet', 0.9, None, 0.0))
+    assert cache.get('  hi ') == ('greet', 0.9, None, 0.0)
+    assert cache.stats()['hit_ratio'] == 1.0
+
+def test_nlu_cache_invalidates_on_artifact_change():
+    from cache import NLUCache
+    version = {'v': 1}
+    cache = NLUCache(version_fn=lambda: version['v'], check_interval=0)
+    cache.put('hello', ('greet', 0.9, None, 0.0))
+    assert cache.get('hello') is not None
+    version['v'] = 2
+    assert cache.get('hello') is None
+    assert cache.stats()['invalidations'] == 1
+
+def test_nlu_cache_ignores_entries_from_another_model_version():
+    from cache import NLUCache
+    cache = NLUCache()
+    cache.clear()                            # reload: v2 is live...
+    cache.put('hello', ('greet', 0.9, None, 0.0, 'v1'), version='v1')  # ...but a v1 request finishes late
+    assert cache.get('hello', version='v2') is None
+    cache.put('hello', ('greet', 0.8, None, 0.0, 'v2'), version='v2')
+    assert cache.get('hello', version='v2')[1] == 0.8
@@ -0,0 +1,35 @@
+import gzip, json, datetime
+from sqlalchemy.orm import sessionmaker
+from db import Base, ConversationLog, archive_logs, make_engine
+
+def temp_db(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+def test_sqlite_runs_in_wal_mode(tmp_path):
+    engine, _ = temp_db(tmp_path)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+
+def test_archive_moves_old_rows_to_compressed_files(tmp_path):
+    _, SessionLocal = temp_db(tmp_path)
+    now = datetime.datetime.utcnow()
+    with SessionLocal() as db:
+        for i in range(5):
+            db.add(ConversationLog(conversation_id='old', user_message=f'm{i}', bot_reply='r',
+                                   timestamp=now - datetime.timedelta(days=40)))
+        db.add(ConversationLog(conversation_id='new', user_message='fresh', bot_reply='r', timestamp=now))
+        db.commit()
+
+    result = archive_logs(datetime.timedelta(days=30), str(tmp_path / 'archive'), batch_size=2,
+                          session_factory=SessionLocal)
+    assert result['archived_rows'] == 5 and len(result['files']) == 3
+
+    archived = []
+    for path in result['files']:
+        with gzip.open(path, 'rt') as f:
+            archived += [json.loads(line) for line in f]
+    assert [r['user_message'] for r in archived] == [f'm{i}' for i in range(5)]
+    with SessionLocal() as db:
+        assert [r.user_message for r in db.query(ConversationLog).all()] == ['fresh']
@@ -0,0 +1,78 @@
+import json, os
+from sklearn.feature_extraction.text import TfidfVectorizer
+from nlp.faq import FAQRetriever
+from nlp.faq_index import FAQIndex, index_path, load_index, open_index, file_checksum
+
+QUESTIONS = ['How can I track my order?', 'How do I cancel my order?', 'What is your return policy?']
+ANSWERS = ['Use the Track Order page.', 'Cancel from My Orders.', 'Returns within 30 days — no questions asked.']
+
+def make_retriever():
+    return FAQRetriever(index=FAQIndex.from_texts(QUESTIONS, ANSWERS, TfidfVectorizer().fit(QUESTIONS)))
+
+def write_csv(path, rows):
+    import csv
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(['question', 'answer'])
+        w.writerows(rows)
+
+def test_search_best_match():
+    faq = make_retriever()
+    answer, score = faq.search('track my order')
+    assert answer == 'Use the Track Order page.'
+    assert 0.0 < score <= 1.0
+
+def test_search_many_ranked():
+    faq = make_retriever()
+    results = faq.search_many(['cancel my order', 'return policy'], k=2)
+    assert len(results) == 2
+    assert results[0][0][0] == 'Cancel from My Orders.'
+    assert results[1][0][0] == ANSWERS[2]
+    assert all(len(r) <= 2 for r in results)
+    scores = [s for _, s in results[0]]
+    assert scores == sorted(scores, reverse=True)
+
+def test_persisted_index_roundtrip_and_staleness(tmp_path):
+    src = tmp_path / 'faq.csv'
+    root = str(tmp_path / 'index')
+    write_csv(src, zip(QUESTIONS, ANSWERS))
+    index = load_index(root, str(src))
+    assert len(index) == 3
+    assert index.answer(2) == ANSWERS[2]
+
+    faq = FAQRetriever(index=index)
+    assert faq.search('cancel my order')[0] == 'Cancel from My Orders.'
+
+    # Editing the source changes the checksum, so the old index is not reused.
+    write_csv(src, [('Do you ship abroad?', 'Yes, to 40 countries.')])
+    fresh = load_index(root, str(src))
+    assert len(fresh) == 1
+    assert os.path.isdir(index_path(root, file_checksum(str(src))))
+
+    # A header from another format version is rejected.
+    path = index_path(root, file_checksum(str(src)))
+    header_file = os.path.join(path, 'header.json')
+    header = json.load(open(header_file))
+    header['format_version'] = -1
+    json.dump(header, open(header_file, 'w'))
+    assert open_index(path) is None
+    assert len(load_index(root, str(src))) == 1
+
+def test_concurrent_rebuilds_keep_the_published_index(tmp_path):
+    import threading
+    from nlp.faq_index import build_index
+    src = tmp_path / 'faq.csv'
+    root = str(tmp_path / 'index')
+    write_csv(src, zip(QUESTIONS, ANSWERS))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(load_index(root, str(src)))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(index is not None and len(index) == 3 for index in results)
+    published = index_path(root, file_checksum(str(src)))
+    stamp = os.stat(os.path.join(published, 'header.json')).st_mtime_ns
+    # Without replace=True a valid index is never swapped out from under its readers.
+    assert build_index(str(src), root) == published
+    assert os.stat(os.path.join(published, 'header.json')).st_mtime_ns == stamp
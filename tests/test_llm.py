@@ -0,0 +1,52 @@
+import asyncio
+import httpx
+import fake_llm
+from llm import LLMClient
+
+def make_client(timeout=5.0):
+    transport = httpx.ASGITransport(app=fake_llm.app)
+    return LLMClient(api_key='test', base_url='http://fake/v1', timeout=timeout, transport=transport)
+
+def test_complete_against_fake_server():
+    async def run():
+        client = make_client()
+        try:
+            return await client.complete('where is my stuff?', [{'user': 'hi', 'bot': 'hello'}])
+        finally:
+            await client.aclose()
+    fake_llm.app.state.delay = 0
+    assert asyncio.run(run()) == fake_llm.REPLY
+
+def test_stream_yields_tokens():
+    async def run():
+        client = make_client()
+        try:
+            return [t async for t in client.stream('where is my stuff?', [])]
+        finally:
+            await client.aclose()
+    fake_llm.app.state.delay = 0
+    tokens = asyncio.run(run())
+    assert len(tokens) > 1
+    assert ''.join(tokens).strip() == fake_llm.REPLY
+
+def test_complete_times_out_to_empty_reply():
+    async def run():
+        client = make_client(timeout=0.05)
+        try:
+            return await client.complete('slow please', [])
+        finally:
+            await client.aclose()
+    fake_llm.app.state.delay = 1.0
+    try:
+        assert asyncio.run(run()) == ""
+    finally:
+        fake_llm.app.state.delay = 0
+
+def test_llm_module_imports_without_httpx():
+    import os, subprocess, sys
+    probe = ("import sys; sys.modules['httpx'] = None\n"
+             "import llm\n"
+             "try:\n    llm.LLMClient(api_key='test')\nexcept RuntimeError as e:\n    print('httpx' in str(e))\n")
+    out = subprocess.run([sys.executable, '-c', probe], cwd=os.path.join(os.path.dirname(__file__), '..'),
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == 'True'
@@ -0,0 +1,42 @@
+import threading
+from log_writer import WriteBehindLogger
+
+class FakeSession:
+    def __init__(self, store):
+        self.store = store
+        self.pending = []
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def bulk_insert_mappings(self, model, rows):
+        self.pending.extend(rows)
+    def commit(self):
+        self.store['commits'] += 1
+        self.store['rows'].extend(self.pending)
+
+def test_rows_are_written_in_bulk_and_flushed_on_close():
+    store = {'commits': 0, 'rows': []}
+    writer = WriteBehindLogger(lambda: FakeSession(store), model=object, batch_size=50, flush_interval=0.05).start()
+    threads = [threading.Thread(target=lambda i=i: [writer.log(user_message=f'{i}-{j}') for j in range(25)])
+               for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close()
+    assert len(store['rows']) == 100
+    assert store['commits'] < 100
+    assert all('timestamp' in r for r in store['rows'])
+    assert writer.stats()['written'] == 100
+
+def test_full_queue_falls_back_to_synchronous_write():
+    store = {'commits': 0, 'rows': []}
+    writer = WriteBehindLogger(lambda: FakeSession(store), model=object, max_queue=1, put_timeout=0.01)
+    writer.log(user_message='queued')      # fills the queue; thread not started
+    writer.log(user_message='overflow')    # written synchronously
+    assert [r['user_message'] for r in store['rows']] == ['overflow']
+    writer.start()
+    writer.close()
+    assert len(store['rows']) == 2
+    assert writer.stats()['sync_writes'] == 1
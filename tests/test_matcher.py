@@ -0,0 +1,64 @@
+import re
+from nlp.matcher import KeywordMatcher, PatternMatcher, keyword_pattern
+from nlp.ner import extract_entities, find_entities
+from nlp.advanced_nlp import KEYWORDS
+
+def naive(text):
+    low = text.lower()
+    for lab, kws in KEYWORDS.items():
+        for kw in kws:
+            if re.search(keyword_pattern(kw), low):
+                return lab
+    return None
+
+def test_keyword_matcher_agrees_with_word_scan():
+    matcher = KeywordMatcher(KEYWORDS)
+    for text in ['Where is my order?', 'refund please, bye', 'ok goodbye human', 'nothing here',
+                 'this is it', 'REFUNDED already', 'tracking my package', 'refunds', 'hi-five', 'his hike',
+                 'need tracking info', 'any news on my refunds?', 'Humans please', '']:
+        assert matcher.best(text) == naive(text), text
+
+def test_keywords_do_not_match_inside_words():
+    matcher = KeywordMatcher(KEYWORDS)
+    for text in ('this', 'they never delivered my parcel', 'do you ship to canada', 'free shipping?'):
+        assert matcher.best(text) != 'greet', text
+        assert not [h for h in matcher.hits(text) if h.label == 'greet'], text
+    assert matcher.best('hi, they said this ships today') == 'greet'
+
+def test_long_keywords_match_inflected_forms():
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.best('I need tracking info') == 'track_order'
+    assert matcher.best('any news on my refunds?') == 'refund_status'
+    assert [(h.label, h.text) for h in matcher.hits('agents, humans')] == [('escalate', 'agents'), ('escalate', 'humans')]
+    # ...but never mid-word, and short keywords never take a suffix
+    assert matcher.best('untracked') is None
+    assert matcher.best('his history') is None
+
+def test_keyword_prefix_of_longer_hit_still_counts():
+    # 'refund status' is the longest hit at its position, 'refund' (higher rank) is its prefix
+    matcher = KeywordMatcher({'a': ['refund'], 'b': ['refund status']})
+    assert matcher.best('my refund status') == 'a'
+    assert [(h.label, h.start, h.end) for h in matcher.hits('my refund status')] == [('b', 3, 16)]
+    # ...but only a prefix that is itself a whole word
+    matcher = KeywordMatcher({'a': ['ab'], 'b': ['abc']})
+    assert matcher.best('x abc x') == 'b'
+    assert matcher.best('xabcx') is None
+    # A stem prefix matches inside the longer keyword on its own, so it counts too
+    matcher = KeywordMatcher({'a': ['refund'], 'b': ['refunded']})
+    assert matcher.best('refunded already') == 'a'
+
+def test_entities_single_pass_with_spans():
+    text = 'order 123-4567890-1234567, mail me at jane@example.com or call +1 415 555 0100'
+    assert extract_entities(text) == {
+        'order_id': '123-4567890-1234567', 'email': 'jane@example.com', 'phone': '1 415 555 0100'}
+    spans = find_entities(text)
+    assert [s.label for s in spans] == ['order_id', 'email', 'phone']
+    assert all(text[s.start:s.end] == s.text for s in spans)
+
+def test_literal_entity_definitions():
+    matcher = PatternMatcher.from_definitions([
+        {'name': 'carrier', 'literals': ['ups', 'usps', 'fedex', 'dhl'], 'ignore_case': True},
+        {'name': 'tracking', 'pattern': r'\b1Z[0-9A-Z]{16}\b'},
+    ])
+    assert matcher.first('shipped with USPS, 1Z999AA10123456784') == {'carrier': 'USPS', 'tracking': '1Z999AA10123456784'}
+    assert matcher.first('upset') == {}
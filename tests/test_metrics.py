@@ -0,0 +1,31 @@
+from metrics import Metrics, request_timings, server_timing_header
+
+def test_render_prometheus_text():
+    m = Metrics(buckets=(0.01, 0.1))
+    m.counter('chat_tickets_created_total', 'Support tickets created')
+    m.histogram('chat_stage_seconds', 'Stage latency')
+    m.inc('chat_tickets_created_total')
+    m.observe('chat_stage_seconds', 0.05, stage='faq_search')
+    text = m.render()
+    assert '# TYPE chat_tickets_created_total counter' in text
+    assert 'chat_tickets_created_total 1' in text
+    assert 'chat_stage_seconds_bucket{stage="faq_search",le="0.01"} 0' in text
+    assert 'chat_stage_seconds_bucket{stage="faq_search",le="0.1"} 1' in text
+    assert 'chat_stage_seconds_bucket{stage="faq_search",le="+Inf"} 1' in text
+    assert 'chat_stage_seconds_count{stage="faq_search"} 1' in text
+
+def test_disabled_metrics_are_noops_but_server_timing_still_collects():
+    m = Metrics(enabled=False)
+    with m.stage('classify_intent'):
+        pass
+    assert 'classify_intent' not in m.render()
+
+    timings = {}
+    token = request_timings.set(timings)
+    try:
+        with m.stage('classify_intent'):
+            pass
+    finally:
+        request_timings.reset(token)
+    assert 'classify_intent' in timings
+    assert server_timing_header(timings).startswith('classify_intent;dur=')
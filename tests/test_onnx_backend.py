@@ -0,0 +1,74 @@
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('transformers')
+pytest.importorskip('onnxruntime')
+pytest.importorskip('onnx')
+
+LABELS = ['greet', 'goodbye', 'track_order', 'refund_status', 'escalate']
+TEXTS = ['hello there', 'bye for now', 'where is my order', 'refund status please', 'talk to a human agent',
+         'hi', 'goodbye', 'track my order', 'is my refund processed', 'human please']
+
+def make_tiny_nli_model(path):
+    """A 2-layer BERT NLI head with random weights and a word-level vocab, built offline."""
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors
+    from transformers import BertConfig, BertForSequenceClassification, PreTrainedTokenizerFast
+
+    words = sorted({w for t in TEXTS + LABELS + ['this example is'] for w in t.replace('_', ' ').split()})
+    vocab = {w: i for i, w in enumerate(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]', '.', '_'] + words)}
+    tok = Tokenizer(models.WordPiece(vocab, unk_token='[UNK]'))
+    tok.normalizer = normalizers.BertNormalizer(lowercase=True)
+    tok.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    tok.post_processor = processors.TemplateProcessing(
+        single='[CLS] $A [SEP]', pair='[CLS] $A [SEP] $B:1 [SEP]:1',
+        special_tokens=[('[CLS]', vocab['[CLS]']), ('[SEP]', vocab['[SEP]'])])
+    PreTrainedTokenizerFast(tokenizer_object=tok, unk_token='[UNK]', pad_token='[PAD]', cls_token='[CLS]',
+                            sep_token='[SEP]', mask_token='[MASK]').save_pretrained(path)
+
+    torch.manual_seed(0)
+    config = BertConfig(vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=64, max_position_embeddings=64, initializer_range=0.5,
+                        id2label={0: 'contradiction', 1: 'neutral', 2: 'entailment'},
+                        label2id={'contradiction': 0, 'neutral': 1, 'entailment': 2})
+    BertForSequenceClassification(config).save_pretrained(path)
+    return str(path)
+
+@pytest.fixture(scope='module')
+def exported(tmp_path_factory):
+    from nlp.onnx_backend import export_onnx
+    root = tmp_path_factory.mktemp('zero_shot')
+    model = make_tiny_nli_model(root / 'tiny')
+    export_onnx(model, str(root / 'fp32'), quantize=False)
+    export_onnx(model, str(root / 'int8'), quantize=True)
+    return model, str(root / 'fp32'), str(root / 'int8')
+
+def scores(result):
+    return dict(zip(result['labels'], result['scores']))
+
+def test_onnx_matches_pytorch(exported):
+    from transformers import pipeline
+    from nlp.onnx_backend import OnnxZeroShot
+    model, fp32_dir, int8_dir = exported
+    reference = pipeline('zero-shot-classification', model=model, tokenizer=model)
+    fp32, int8 = OnnxZeroShot(fp32_dir), OnnxZeroShot(int8_dir)
+
+    ref, exact, quant = reference(TEXTS, LABELS), fp32(TEXTS, LABELS), int8(TEXTS, LABELS)
+    for r, e, q in zip(ref, exact, quant):
+        assert e['labels'][0] == r['labels'][0]
+        assert all(abs(scores(e)[l] - scores(r)[l]) < 1e-4 for l in LABELS)
+        assert all(abs(scores(q)[l] - scores(r)[l]) < 0.15 for l in LABELS)
+    agreement = sum(q['labels'][0] == r['labels'][0] for r, q in zip(ref, quant)) / len(TEXTS)
+    assert agreement >= 0.8
+
+def test_advanced_nlp_uses_onnx_backend(exported):
+    from nlp.advanced_nlp import AdvancedNLP
+    model, _, int8_dir = exported
+    nlp = AdvancedNLP(intents_list=LABELS, zero_shot_backend='onnx', zero_shot_model=model, onnx_dir=int8_dir)
+    assert nlp.zero_shot_backend == 'onnx'
+    from model_registry import _file_digest, _zero_shot_version
+    assert _zero_shot_version(nlp) == f"onnx-{_file_digest(nlp.zero_shot.model_path)}"
+    label, conf, meta = nlp.classify_intent('where is my order')
+    assert label in LABELS and meta['tier'] == 'zero_shot'
+
+    fallback = AdvancedNLP(intents_list=LABELS, zero_shot_backend='onnx', zero_shot_model=model, onnx_dir=int8_dir + '-missing')
+    assert fallback.zero_shot_backend == 'torch'
@@ -0,0 +1,29 @@
+import time
+from sessions import SessionStore
+
+def test_followup_needs_a_missing_slot_and_few_extra_words():
+    store = SessionStore(max_extra_words=3)
+    store.set_pending('c1', 'track_order', 0.6, {'email': 'a@b.co'}, ['order_id'])
+    assert store.followup('c1', {'phone': '555 0100'}, 0) is None
+    assert store.followup('c1', {'order_id': '123-4567890-1234567'}, 8) is None
+    assert store.followup('c2', {'order_id': '123-4567890-1234567'}, 0) is None
+    assert store.followup('c1', {'order_id': '123-4567890-1234567'}, 1, intent='track_order') is not None
+    session = store.followup('c1', {'order_id': '123-4567890-1234567'}, 2)
+    assert session.intent == 'track_order' and session.slots == {'email': 'a@b.co'}
+    store.clear('c1')
+    assert store.get('c1') is None
+
+def test_bounded_and_expiring():
+    store = SessionStore(max_sessions=2, ttl=0.05)
+    for i in range(3):
+        store.set_pending(f'c{i}', 'refund_status', 0.5, {}, ['order_id'])
+    assert store.get('c0') is None and store.stats()['evictions'] == 1
+    time.sleep(0.1)
+    assert store.followup('c2', {'order_id': 'x'}, 0) is None
+    assert store.stats()['expirations'] == 1
+
+def test_followup_naming_another_intent_drops_session():
+    store = SessionStore()
+    store.set_pending('c1', 'track_order', 0.6, {}, ['order_id'])
+    assert store.followup('c1', {'order_id': '123-4567890-1234567'}, 2, intent='cancel_order') is None
+    assert store.get('c1') is None and store.stats()['switches'] == 1
@@ -0,0 +1,20 @@
+import json, os, subprocess, sys
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+HEAVY_MODULES = ('transformers', 'torch', 'pandas', 'sklearn', 'scipy')
+# Generous default; tighten in CI with STARTUP_BUDGET_SECONDS
+BUDGET = float(os.environ.get('STARTUP_BUDGET_SECONDS', '5.0'))
+
+PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import app
+elapsed = time.perf_counter() - t
+print(json.dumps({'seconds': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+def test_import_is_fast_and_defers_heavy_modules():
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result['loaded'] == []
+    assert result['seconds'] < BUDGET
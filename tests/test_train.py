@@ -0,0 +1,34 @@
+import json, random
+import nlp.advanced_nlp as advanced_nlp
+from nlp.advanced_nlp import AdvancedNLP
+from nlp.train import chunked, iter_jsonl, load_intents, train_streaming
+
+PREFIXES = ['', 'hey, ', 'quick one: ', 'please ', 'hi team ', 'so ']
+
+def write_examples(path, n=3000, seed=0):
+    rng = random.Random(seed)
+    texts, labels = load_intents()
+    with open(path, 'w') as f:
+        for i in range(n):
+            j = rng.randrange(len(texts))
+            f.write(json.dumps({'text': f'{rng.choice(PREFIXES)}{texts[j]} #{i}', 'intent': labels[j]}) + '\n')
+
+def test_chunked_streams_without_materializing():
+    chunks = list(chunked(iter((str(i), 'x') for i in range(25)), 10))
+    assert [len(texts) for texts, _ in chunks] == [10, 10, 5]
+
+def test_streaming_training_picks_a_model_that_serves(tmp_path, capsys, monkeypatch):
+    path = tmp_path / 'examples.jsonl'
+    write_examples(path)
+    pipeline = train_streaming(lambda: iter_jsonl(str(path)), chunk_size=500, epochs=3, n_features=2 ** 14,
+                               holdout_percent=10, jobs=2, param_grid={'loss': ['hinge', 'log_loss'], 'alpha': [1e-4]})
+    out = capsys.readouterr().out
+    assert 'Best:' in out and 'macro avg' in out
+    assert pipeline.predict(['where is my order #1'])[0] == 'track_order'
+
+    # Only the trained pipeline is under test; never load the zero-shot model
+    monkeypatch.setattr(advanced_nlp, '_zero_shot_available', False)
+    nlp = AdvancedNLP(batching=False, cascade=False)
+    nlp.fallback = pipeline
+    label, conf, meta = nlp.classify_intent('I want a refund')
+    assert label == 'refund_status' and 0.0 < conf < 1.0